@@ -1,7 +1,7 @@
 from django.contrib import admin
 from unfold.admin import ModelAdmin, StackedInline
 from django.utils.translation import gettext_lazy as _
-from .models import User, UserProfile
+from .models import User, UserProfile, SocialAccountHealth
 
 
 class UserProfileInline(StackedInline):
@@ -33,3 +33,11 @@ class UserAdmin(ModelAdmin):
 
 
 admin.site.register(User, UserAdmin)
+
+
+@admin.register(SocialAccountHealth)
+class SocialAccountHealthAdmin(ModelAdmin):
+    list_display = ('social_account', 'needs_reauth', 'last_refreshed_at', 'updated_at')
+    list_filter = ('needs_reauth',)
+    raw_id_fields = ('social_account',)
+    readonly_fields = ('updated_at',)
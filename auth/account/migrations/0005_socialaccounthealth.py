@@ -0,0 +1,32 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0004_alter_user_username'),
+        ('socialaccount', '0006_alter_socialaccount_extra_data'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SocialAccountHealth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('needs_reauth', models.BooleanField(default=False, help_text='Token could not be refreshed; the user must reconnect this account')),
+                ('last_refresh_error', models.TextField(blank=True)),
+                ('last_refreshed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('social_account', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='health', to='socialaccount.socialaccount')),
+            ],
+        ),
+        # allauth's SocialToken has no index on expires_at; the refresh sweeper range-scans it.
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS socialaccount_socialtoken_expires_at_idx "
+            "ON socialaccount_socialtoken (expires_at)",
+            reverse_sql="DROP INDEX IF EXISTS socialaccount_socialtoken_expires_at_idx",
+        ),
+    ]
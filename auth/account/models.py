@@ -65,3 +65,19 @@ class UserProfile(models.Model):
     
     def __str__(self):
         return f"Profile for {self.user.email}"
+
+
+class SocialAccountHealth(models.Model):
+    social_account = models.OneToOneField(
+        'socialaccount.SocialAccount', on_delete=models.CASCADE, related_name='health'
+    )
+    needs_reauth = models.BooleanField(
+        default=False, help_text="Token could not be refreshed; the user must reconnect this account"
+    )
+    last_refresh_error = models.TextField(blank=True)
+    last_refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Health for {self.social_account}"
@@ -112,6 +112,8 @@ class ConnectedAccountSerializer(serializers.ModelSerializer):
         # Add custom field values
         representation["social_account_id"] = instance.id
         representation["social_app_id"] = self.get_social_app_id(instance)
+        health = getattr(instance, "health", None)
+        representation["needs_reauth"] = bool(health and health.needs_reauth)
         return representation
     
     def get_social_app_id(self, obj):
@@ -205,6 +205,6 @@ class ConnectedAccountsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        accounts = SocialAccount.objects.filter(user=request.user)
+        accounts = SocialAccount.objects.filter(user=request.user).select_related("health")
         serializer = ConnectedAccountSerializer(accounts, many=True)
         return Response(serializer.data)
\ No newline at end of file
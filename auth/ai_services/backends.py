@@ -0,0 +1,158 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .client import get_openai_client
+
+LOCAL_VOCABULARY = (
+    "launch growth community brand story daily tips inspiration team product design "
+    "creative marketing social trends insights weekend morning coffee travel fitness "
+    "food tech startup learning success motivation behind scenes new today together"
+).split()
+
+_backend = None
+_lock = threading.Lock()
+
+
+class CompletionBackend:
+    """
+    Where chat completions come from.
+
+    complete() returns {"content", "tokens_used"}. stream() yields ("delta", text)
+    for each chunk and finishes with a single ("usage", tokens_used).
+    """
+
+    def complete(self, model, messages, **params):
+        raise NotImplementedError
+
+    def stream(self, model, messages, **params):
+        raise NotImplementedError
+
+
+class OpenAIBackend(CompletionBackend):
+    def complete(self, model, messages, **params):
+        response = get_openai_client().chat.completions.create(model=model, messages=messages, **params)
+        if not response or not getattr(response, 'choices', None):
+            return {"content": None, "tokens_used": 0}
+
+        return {
+            "content": response.choices[0].message.content,
+            "tokens_used": response.usage.total_tokens,
+        }
+
+    def stream(self, model, messages, **params):
+        response = get_openai_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            stream_options={"include_usage": True},
+            **params
+        )
+
+        tokens_used = 0
+        for chunk in response:
+            if chunk.usage:
+                tokens_used = chunk.usage.total_tokens
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield "delta", chunk.choices[0].delta.content
+        yield "usage", tokens_used
+
+
+class LocalBackend(CompletionBackend):
+    """
+    Deterministic offline stand-in for load tests and local development.
+
+    The same model and messages always produce the same output, so the caching
+    and single-flight layers behave as they do in production. LATENCY is paid
+    before the first token and TOKEN_LATENCY for every generated word. JSON mode
+    returns one object carrying every shape the app parses (hashtags, numbered
+    caption variants, posting-time suggestions).
+    """
+
+    def __init__(self, latency=0.0, token_latency=0.0, max_words=60):
+        self.latency = latency
+        self.token_latency = token_latency
+        self.max_words = max_words
+
+    def _rng(self, model, messages):
+        digest = hashlib.sha256(json.dumps([model, messages], sort_keys=True).encode()).digest()
+        return random.Random(digest)
+
+    def _words(self, rng, max_tokens):
+        count = min(self.max_words, max_tokens or self.max_words)
+        return [rng.choice(LOCAL_VOCABULARY) for _ in range(max(1, count // 2))]
+
+    def _text(self, rng, max_tokens):
+        words = self._words(rng, max_tokens)
+        words[0] = words[0].capitalize()
+        tags = " ".join(f"#{rng.choice(LOCAL_VOCABULARY)}" for _ in range(3))
+        return f"{' '.join(words)}. {tags}"
+
+    def _json(self, rng, messages):
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        variants = len(re.findall(r'^\d+\. ', system, re.MULTILINE)) or 1
+        return json.dumps({
+            "hashtags": rng.sample(LOCAL_VOCABULARY, 10),
+            "captions": [
+                {"index": index, "caption": self._text(rng, 40)} for index in range(variants)
+            ],
+            "suggestions": [
+                {"day": day, "time": f"{rng.randint(7, 20):02d}:00", "reason": "Peak audience activity"}
+                for day in ("Monday", "Wednesday", "Friday")
+            ],
+        })
+
+    def _generate(self, model, messages, params):
+        rng = self._rng(model, messages)
+        if (params.get("response_format") or {}).get("type") == "json_object":
+            content = self._json(rng, messages)
+        else:
+            content = self._text(rng, params.get("max_tokens"))
+        prompt_tokens = sum(len(m["content"].split()) for m in messages if isinstance(m.get("content"), str))
+        return content, prompt_tokens + len(content.split())
+
+    def complete(self, model, messages, **params):
+        content, tokens_used = self._generate(model, messages, params)
+        time.sleep(self.latency + self.token_latency * len(content.split()))
+        return {"content": content, "tokens_used": tokens_used}
+
+    def stream(self, model, messages, **params):
+        content, tokens_used = self._generate(model, messages, params)
+        time.sleep(self.latency)
+        for word in re.findall(r'\S+\s*', content):
+            time.sleep(self.token_latency)
+            yield "delta", word
+        yield "usage", tokens_used
+
+
+BACKENDS = {
+    "openai": OpenAIBackend,
+    "local": LocalBackend,
+}
+
+
+def get_backend():
+    """
+    Return the process-wide completion backend named by settings.AI_BACKEND:
+    "openai", "local", or a dotted path to a CompletionBackend subclass.
+    """
+    global _backend
+    if _backend is None:
+        with _lock:
+            if _backend is None:
+                name = settings.AI_BACKEND
+                backend_class = BACKENDS.get(name) or import_string(name)
+                if backend_class is LocalBackend:
+                    _backend = LocalBackend(
+                        latency=settings.AI_LOCAL_LATENCY,
+                        token_latency=settings.AI_LOCAL_TOKEN_LATENCY,
+                    )
+                else:
+                    _backend = backend_class()
+    return _backend
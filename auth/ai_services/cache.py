@@ -0,0 +1,104 @@
+import hashlib
+import json
+import logging
+import re
+import time
+
+from django.conf import settings
+
+from auth.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+ENTRY_KEY = "aicache:entry:{}"
+LRU_KEY = "aicache:lru"
+STATS_KEY = "aicache:stats"
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_prompt(text):
+    """Case- and whitespace-insensitive form of a prompt, so trivially different inputs share an entry."""
+    return WHITESPACE_RE.sub(' ', str(text)).strip().casefold()
+
+
+def make_key(model, messages, scope=None, params=None):
+    payload = {
+        "model": model,
+        "messages": [
+            {"role": message["role"], "content": normalize_prompt(message["content"])}
+            for message in messages
+        ],
+        "scope": scope,
+        "params": params or {},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def lookup(key, namespace):
+    """Return the cached generation for a key, or None. Records a hit or miss for the namespace."""
+    client = get_redis()
+    try:
+        raw = client.get(ENTRY_KEY.format(key))
+        with client.pipeline(transaction=False) as pipe:
+            if raw is not None:
+                pipe.zadd(LRU_KEY, {key: time.time()})
+                pipe.hincrby(STATS_KEY, f"{namespace}:hits", 1)
+            else:
+                pipe.hincrby(STATS_KEY, f"{namespace}:misses", 1)
+            pipe.execute()
+    except Exception as e:
+        # The cache is an optimisation; a Redis problem should fall through to the model
+        logger.warning(f"AI cache lookup failed: {str(e)}")
+        return None
+
+    return json.loads(raw) if raw is not None else None
+
+
+def peek(key):
+    """Read an entry without touching LRU order or hit/miss statistics."""
+    try:
+        raw = get_redis().get(ENTRY_KEY.format(key))
+    except Exception:
+        return None
+    return json.loads(raw) if raw is not None else None
+
+
+def store(key, value):
+    """Store a generation with a TTL, evicting the least recently used entries past the size cap."""
+    client = get_redis()
+    try:
+        with client.pipeline(transaction=False) as pipe:
+            pipe.set(ENTRY_KEY.format(key), json.dumps(value), ex=settings.AI_CACHE_TTL)
+            pipe.zadd(LRU_KEY, {key: time.time()})
+            pipe.zcard(LRU_KEY)
+            size = pipe.execute()[-1]
+
+        overflow = size - settings.AI_CACHE_MAX_ENTRIES
+        if overflow > 0:
+            evicted = [member for member, _ in client.zpopmin(LRU_KEY, overflow)]
+            client.delete(*[ENTRY_KEY.format(member.decode()) for member in evicted])
+    except Exception as e:
+        logger.warning(f"AI cache store failed: {str(e)}")
+
+
+def stats():
+    """Hit/miss counts and hit ratio per namespace, plus the current entry count."""
+    client = get_redis()
+    counters = {k.decode(): int(v) for k, v in client.hgetall(STATS_KEY).items()}
+
+    namespaces = {}
+    for field, count in counters.items():
+        namespace, _, kind = field.rpartition(':')
+        namespaces.setdefault(namespace, {"hits": 0, "misses": 0})[kind] = count
+
+    for counts in namespaces.values():
+        total = counts["hits"] + counts["misses"]
+        counts["hit_ratio"] = round(counts["hits"] / total, 4) if total else 0.0
+
+    return {
+        "entries": client.zcard(LRU_KEY),
+        "max_entries": settings.AI_CACHE_MAX_ENTRIES,
+        "ttl": settings.AI_CACHE_TTL,
+        "namespaces": namespaces,
+    }
@@ -0,0 +1,33 @@
+import threading
+
+import httpx
+from django.conf import settings
+from openai import DefaultHttpxClient, OpenAI
+
+_client = None
+_lock = threading.Lock()
+
+
+def get_openai_client():
+    """
+    Return the process-wide OpenAI client.
+    Built on first use so importing views does no work, and shared so every request
+    reuses the same pooled keep-alive connections instead of paying for a new TLS handshake.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT),
+                    max_retries=settings.OPENAI_MAX_RETRIES,
+                    http_client=DefaultHttpxClient(
+                        limits=httpx.Limits(
+                            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+                        ),
+                    ),
+                )
+    return _client
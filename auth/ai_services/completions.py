@@ -0,0 +1,61 @@
+from . import cache, singleflight
+from .backends import get_backend
+
+
+def complete(messages, model, namespace, cache_scope=None, **params):
+    """
+    Run a chat completion through the generation cache.
+
+    Returns a dict with the completion content, the tokens it cost (0 when served
+    from the cache or by another in-flight request) and whether it was cached.
+    cache_scope carries request context that is not part of the prompt text, such
+    as the target platform.
+    """
+    key = cache.make_key(model, messages, cache_scope, params)
+
+    cached = cache.lookup(key, namespace)
+    if cached is not None:
+        return {"content": cached["content"], "tokens_used": 0, "cached": True}
+
+    def generate():
+        result = get_backend().complete(model, messages, **params)
+        if result["content"] is not None:
+            cache.store(key, result)
+        return result
+
+    # Identical requests already in flight elsewhere wait for that completion instead of repeating it
+    result, is_leader = singleflight.do(key, generate, recheck=lambda: cache.peek(key))
+    if not is_leader:
+        return {"content": result["content"], "tokens_used": 0, "cached": True}
+    return {**result, "cached": False}
+
+
+def stream(messages, model, namespace, cache_scope=None, **params):
+    """
+    Streaming counterpart of complete().
+
+    Yields ("delta", text) for each chunk as it arrives, then a single
+    ("done", {"content", "tokens_used", "cached"}). Cache hits are replayed as
+    one delta. The full completion is cached once the stream finishes.
+    """
+    key = cache.make_key(model, messages, cache_scope, params)
+
+    cached = cache.lookup(key, namespace)
+    if cached is not None:
+        yield "delta", cached["content"]
+        yield "done", {"content": cached["content"], "tokens_used": 0, "cached": True}
+        return
+
+    parts = []
+    tokens_used = 0
+    for kind, payload in get_backend().stream(model, messages, **params):
+        if kind == "usage":
+            tokens_used = payload
+            continue
+        parts.append(payload)
+        yield "delta", payload
+
+    result = {"content": "".join(parts), "tokens_used": tokens_used}
+    if result["content"]:
+        cache.store(key, result)
+    yield "done", {**result, "cached": False}
@@ -0,0 +1,150 @@
+import threading
+import time
+from datetime import date
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from auth.redis_client import get_redis
+from subscriptions.models import AIUsage, Subscription
+
+PENDING_KEY = "aimeter:pending"
+FLUSH_KEY = "aimeter:flushing"
+MONTH_KEY = "aimeter:month:{month}:{user_id}"
+MONTH_KEY_TTL = 40 * 24 * 60 * 60
+
+# Plan limits change rarely, so each process keeps them for a minute instead of querying per call
+PLAN_LIMIT_TTL = 60
+
+_limits = {}
+_limits_lock = threading.Lock()
+
+
+def current_month():
+    return timezone.now().strftime("%Y%m")
+
+
+def record(user_id, endpoint, tokens):
+    """
+    Buffer one AI call's token usage.
+    The monthly counter is updated immediately for quota checks; the per-endpoint
+    totals wait in a Redis hash until flush() writes them to AIUsage.
+    """
+    month = current_month()
+    field = f"{user_id}:{endpoint}:{month}"
+    month_key = MONTH_KEY.format(month=month, user_id=user_id)
+
+    pipe = get_redis().pipeline(transaction=False)
+    pipe.hincrby(PENDING_KEY, f"{field}:tokens", tokens)
+    pipe.hincrby(PENDING_KEY, f"{field}:requests", 1)
+    if tokens:
+        pipe.incrby(month_key, tokens)
+        pipe.expire(month_key, MONTH_KEY_TTL)
+    pipe.execute()
+
+
+def monthly_tokens(user_id):
+    """Tokens used this month, from the Redis counter (seeded from AIUsage if Redis lost it)."""
+    month = current_month()
+    month_key = MONTH_KEY.format(month=month, user_id=user_id)
+    client = get_redis()
+
+    used = client.get(month_key)
+    if used is not None:
+        return int(used)
+
+    used = AIUsage.objects.filter(
+        user_id=user_id, month=date(int(month[:4]), int(month[4:]), 1)
+    ).aggregate(total=Sum('tokens'))['total'] or 0
+    client.set(month_key, used, ex=MONTH_KEY_TTL, nx=True)
+    return int(client.get(month_key) or used)
+
+
+def _load_monthly_limit(user_id):
+    subscription = (
+        Subscription.objects.filter(user_id=user_id, status__in=('active', 'trial'))
+        .select_related('plan')
+        .order_by('-start_date')
+        .first()
+    )
+    if subscription is None:
+        limit = settings.AI_DEFAULT_MONTHLY_TOKENS
+    elif not subscription.plan.ai_generation:
+        return 0
+    else:
+        limit = subscription.plan.monthly_ai_tokens
+    # 0 means unlimited, as for the other plan limits
+    return limit or None
+
+
+def monthly_limit(user_id):
+    """The user's monthly token cap: None for unlimited, 0 when the plan has no AI generation."""
+    now = time.monotonic()
+    cached = _limits.get(user_id)
+    if cached is not None and cached[1] > now:
+        return cached[0]
+
+    limit = _load_monthly_limit(user_id)
+    with _limits_lock:
+        _limits[user_id] = (limit, now + PLAN_LIMIT_TTL)
+    return limit
+
+
+def has_quota(user_id):
+    limit = monthly_limit(user_id)
+    if limit is None:
+        return True
+    if limit == 0:
+        return False
+    return monthly_tokens(user_id) < limit
+
+
+def flush():
+    """Write buffered usage to AIUsage with one bulk update and one bulk insert."""
+    client = get_redis()
+    if not client.exists(FLUSH_KEY):
+        try:
+            client.rename(PENDING_KEY, FLUSH_KEY)
+        except Exception:
+            # Nothing buffered since the last flush
+            return 0
+
+    usage = {}
+    for field, count in client.hgetall(FLUSH_KEY).items():
+        user_id, endpoint, month, kind = field.decode().split(':')
+        totals = usage.setdefault(
+            (int(user_id), endpoint, date(int(month[:4]), int(month[4:]), 1)),
+            {'tokens': 0, 'requests': 0}
+        )
+        totals[kind] += int(count)
+
+    if usage:
+        with transaction.atomic():
+            existing = {
+                (row.user_id, row.endpoint, row.month): row
+                for row in AIUsage.objects.filter(
+                    user_id__in={key[0] for key in usage},
+                    month__in={key[2] for key in usage},
+                )
+            }
+
+            now = timezone.now()
+            updated = []
+            for key, row in existing.items():
+                if key in usage:
+                    row.tokens = F('tokens') + usage[key]['tokens']
+                    row.requests = F('requests') + usage[key]['requests']
+                    row.updated_at = now
+                    updated.append(row)
+            if updated:
+                AIUsage.objects.bulk_update(updated, ['tokens', 'requests', 'updated_at'])
+
+            AIUsage.objects.bulk_create([
+                AIUsage(user_id=key[0], endpoint=key[1], month=key[2], **totals)
+                for key, totals in usage.items() if key not in existing
+            ])
+
+    client.delete(FLUSH_KEY)
+    return sum(totals['tokens'] for totals in usage.values())
@@ -0,0 +1,16 @@
+from rest_framework.permissions import BasePermission
+
+from . import metering
+
+
+class WithinAIQuota(BasePermission):
+    """
+    Rejects AI requests from users whose plan has no AI generation or whose
+    monthly token quota is used up. Anonymous requests are not metered.
+    """
+    message = "AI generation is not available on your plan or this month's token quota has been used."
+
+    def has_permission(self, request, view):
+        if not request.user or not request.user.is_authenticated:
+            return True
+        return metering.has_quota(request.user.id)
@@ -0,0 +1,33 @@
+import json
+
+from .completions import complete
+
+OPTIMAL_TIME_MODEL = "gpt-3.5-turbo"
+
+
+def generate_optimal_time(platform, timezone):
+    """
+    Ask the model for the best posting times.
+    Returns (parsed JSON object, completion result).
+    """
+    system_prompt = f"""You are a social media timing expert. Suggest the best posting time for {platform} in {timezone} timezone.
+Consider:
+- Peak user activity periods
+- Target audience behavior
+- Platform-specific algorithms
+- Day of the week variations
+Return a JSON object with suggested times and brief explanations."""
+
+    result = complete(
+        model=OPTIMAL_TIME_MODEL,
+        namespace="optimal_time",
+        messages=[
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"What are the best posting times for {platform} in {timezone}?"}
+        ],
+        temperature=0.7,
+        max_tokens=200,
+        response_format={"type": "json_object"}
+    )
+
+    return json.loads(result["content"]), result
@@ -0,0 +1,95 @@
+import json
+import logging
+import time
+import uuid
+
+from django.conf import settings
+
+from auth.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = "aiflight:lock:{}"
+CHANNEL = "aiflight:done:{}"
+
+# Delete the lock only if we still own it, so a slow leader cannot release a successor's lock
+RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _LeaderFailed(Exception):
+    pass
+
+
+def _lock_ttl():
+    return settings.OPENAI_TIMEOUT * (settings.OPENAI_MAX_RETRIES + 1) + 5
+
+
+def _wait_for_leader(client, key, recheck):
+    """Block on the leader's result channel; returns the result or raises _LeaderFailed."""
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(CHANNEL.format(key))
+    try:
+        # The leader may have finished between our lock attempt and subscribing
+        result = recheck()
+        if result is not None:
+            return result
+        if not client.exists(LOCK_KEY.format(key)):
+            raise _LeaderFailed()
+
+        deadline = time.monotonic() + _lock_ttl()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise _LeaderFailed()
+            message = pubsub.get_message(timeout=remaining)
+            if message is None or message["type"] != "message":
+                continue
+            payload = json.loads(message["data"])
+            if not payload["ok"]:
+                raise _LeaderFailed()
+            return payload["result"]
+    finally:
+        pubsub.close()
+
+
+def do(key, fn, recheck):
+    """
+    Run fn once for all concurrent callers sharing a key, across every process.
+
+    The first caller takes a Redis lock and runs fn, then publishes the result on a
+    channel. Everyone else subscribes and waits for it instead of repeating the work.
+    recheck looks the result up in the cache, covering a leader that finished before
+    a follower subscribed. If the leader fails or times out, followers run fn themselves.
+    Returns (result, is_leader).
+    """
+    try:
+        client = get_redis()
+        token = uuid.uuid4().hex
+        leader = client.set(LOCK_KEY.format(key), token, nx=True, px=int(_lock_ttl() * 1000))
+    except Exception as e:
+        logger.warning(f"Single-flight lock unavailable, running directly: {str(e)}")
+        return fn(), True
+
+    if not leader:
+        try:
+            return _wait_for_leader(client, key, recheck), False
+        except _LeaderFailed:
+            return fn(), True
+        except Exception as e:
+            logger.warning(f"Single-flight wait failed, running directly: {str(e)}")
+            return fn(), True
+
+    try:
+        result = fn()
+        client.publish(CHANNEL.format(key), json.dumps({"ok": True, "result": result}))
+        return result, True
+    except Exception:
+        client.publish(CHANNEL.format(key), json.dumps({"ok": False}))
+        raise
+    finally:
+        client.eval(RELEASE_SCRIPT, 1, LOCK_KEY.format(key), token)
@@ -0,0 +1,112 @@
+import ipaddress
+import logging
+import socket
+from urllib.parse import urlsplit
+
+import requests
+from celery import shared_task
+from django.core.cache import cache
+
+from content.models import Caption
+from content.serializers import CaptionSerializer, HashtagSerializer
+from content.services import generate_caption, generate_hashtags
+from . import metering
+from .services import generate_optimal_time
+
+logger = logging.getLogger(__name__)
+
+JOB_KEY = "aijob:{}"
+JOB_TTL = 24 * 60 * 60
+CALLBACK_TIMEOUT = 10
+
+
+def _caption_job(params):
+    result = generate_caption(**params)
+    caption = Caption(text=result["content"] or "", platform=params["platform"], is_saved=False)
+    caption_data = CaptionSerializer(caption).data
+    caption_data["hashtags"] = result["hashtags"]
+    return {"caption": caption_data, "tokens_used": result["tokens_used"], "cached": result["cached"]}
+
+
+def _hashtags_job(params):
+    hashtags, result = generate_hashtags(**params)
+    return {
+        "hashtags": HashtagSerializer(hashtags, many=True).data,
+        "tokens_used": result["tokens_used"],
+        "cached": result["cached"],
+    }
+
+
+def _optimal_time_job(params):
+    suggestions, result = generate_optimal_time(params["platform"], params["timezone"])
+    return {"suggestions": suggestions, "tokens_used": result["tokens_used"], "cached": result["cached"]}
+
+
+JOB_HANDLERS = {
+    "caption": _caption_job,
+    "hashtags": _hashtags_job,
+    "optimal_time": _optimal_time_job,
+}
+
+
+def remember_job_owner(job_id, user_id):
+    cache.set(JOB_KEY.format(job_id), user_id, timeout=JOB_TTL)
+
+
+def get_job_owner(job_id):
+    return cache.get(JOB_KEY.format(job_id))
+
+
+def is_valid_callback_url(url):
+    """Callbacks may only target public http(s) hosts, never internal services."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        return False
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(parts.hostname, None)}
+    except socket.gaierror:
+        return False
+    return all(ipaddress.ip_address(address).is_global for address in addresses)
+
+
+def _send_callback(url, payload):
+    if not is_valid_callback_url(url):
+        logger.warning(f"Skipping AI job callback to disallowed URL {url}")
+        return
+    try:
+        requests.post(url, json=payload, timeout=CALLBACK_TIMEOUT, allow_redirects=False)
+    except requests.RequestException as e:
+        logger.warning(f"AI job callback to {url} failed: {str(e)}")
+
+
+@shared_task(bind=True)
+def run_ai_job(self, job_type, params, callback_url=None, user_id=None):
+    """Run a queued AI generation; the returned payload is what the polling endpoint serves."""
+    try:
+        result = JOB_HANDLERS[job_type](params)
+        if user_id is not None:
+            metering.record(user_id, job_type, result["tokens_used"])
+        payload = {
+            "job_id": self.request.id,
+            "type": job_type,
+            "status": "succeeded",
+            "result": result,
+        }
+    except Exception as e:
+        logger.error(f"AI job {self.request.id} ({job_type}) failed: {str(e)}")
+        payload = {
+            "job_id": self.request.id,
+            "type": job_type,
+            "status": "failed",
+            "error": str(e),
+        }
+
+    if callback_url:
+        _send_callback(callback_url, payload)
+
+    return payload
+
+
+@shared_task
+def flush_ai_usage_task():
+    return metering.flush()
@@ -3,5 +3,9 @@ from . import views
 
 urlpatterns = [
     path('generate/', views.generate_content, name='generate_content'),
+    path('generate/stream/', views.generate_content_stream, name='generate_content_stream'),
     path('optimal-time/', views.get_optimal_time, name='get_optimal_time'),
+    path('cache/stats/', views.cache_stats, name='ai_cache_stats'),
+    path('jobs/', views.submit_job, name='submit_ai_job'),
+    path('jobs/<str:job_id>/', views.job_status, name='ai_job_status'),
 ] 
\ No newline at end of file
@@ -1,12 +1,23 @@
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.renderers import JSONRenderer
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from openai import OpenAI
-from django.conf import settings
 from datetime import datetime
-import json
+from celery.result import AsyncResult
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+from content.models import Caption, Media
+from content.serializers import CaptionGenerateSerializer, HashtagGenerateSerializer
+
+from . import cache, metering
+from .completions import complete, stream
+from .permissions import WithinAIQuota
+from .services import generate_optimal_time
+from .tasks import get_job_owner, is_valid_callback_url, remember_job_owner, run_ai_job
+from .sse import EventStreamRenderer, event_stream_response, format_event
+
+GENERATE_MODEL = "gpt-3.5-turbo"
+GENERATE_PARAMS = {"temperature": 0.7, "max_tokens": 150}
 
 def create_system_prompt(generation_type, context):
     # Base prompt
@@ -63,7 +74,14 @@ def create_system_prompt(generation_type, context):
 
     return prompt
 
+def build_generate_messages(generation_type, prompt, context):
+    return [
+        {"role": "system", "content": create_system_prompt(generation_type, context)},
+        {"role": "user", "content": prompt or "Generate engaging social media content"}
+    ]
+
 @api_view(['POST'])
+@permission_classes([WithinAIQuota])
 def generate_content(request):
     try:
         # Extract request data
@@ -77,22 +95,18 @@ def generate_content(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Create system prompt
-        system_prompt = create_system_prompt(generation_type, context)
-
-        # Call OpenAI API with new format
-        completion = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt or "Generate engaging social media content"}
-            ],
-            temperature=0.7,
-            max_tokens=150
+        result = complete(
+            messages=build_generate_messages(generation_type, prompt, context),
+            model=GENERATE_MODEL,
+            namespace="generate_content",
+            **GENERATE_PARAMS
         )
+        if request.user.is_authenticated:
+            metering.record(request.user.id, "generate_content", result['tokens_used'])
 
         return Response({
-            'content': completion.choices[0].message.content
+            'content': result['content'],
+            'cached': result['cached']
         })
 
     except Exception as e:
@@ -102,6 +116,58 @@ def generate_content(request):
         )
 
 @api_view(['POST'])
+@permission_classes([WithinAIQuota])
+@renderer_classes([JSONRenderer, EventStreamRenderer])
+def generate_content_stream(request):
+    """
+    Stream generated content over Server-Sent Events.
+    Captions generated by signed-in users are stored as a Caption (is_saved=False) when the stream ends.
+    """
+    generation_type = request.data.get('type')
+    prompt = request.data.get('prompt', '')
+    context = request.data.get('context', {})
+
+    if not generation_type:
+        return Response(
+            {'error': 'Missing generation type'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    messages = build_generate_messages(generation_type, prompt, context)
+    user = request.user
+    platforms = context.get('platforms', [])
+    platform = platforms[0] if len(platforms) == 1 else 'all'
+    if platform not in dict(Caption.PLATFORM_CHOICES):
+        platform = 'all'
+
+    def events():
+        try:
+            for kind, payload in stream(
+                messages=messages,
+                model=GENERATE_MODEL,
+                namespace="generate_content",
+                **GENERATE_PARAMS
+            ):
+                if kind == "delta":
+                    yield format_event("token", {"content": payload})
+                    continue
+
+                done = {"content": payload["content"], "cached": payload["cached"]}
+                if user.is_authenticated:
+                    metering.record(user.id, "generate_content", payload["tokens_used"])
+                if generation_type == "caption" and user.is_authenticated and payload["content"]:
+                    caption = Caption.objects.create(
+                        user=user, text=payload["content"], platform=platform, is_saved=False
+                    )
+                    done["caption_id"] = caption.id
+                yield format_event("done", done)
+        except Exception as e:
+            yield format_event("error", {"error": str(e)})
+
+    return event_stream_response(events())
+
+@api_view(['POST'])
+@permission_classes([WithinAIQuota])
 def get_optimal_time(request):
     try:
         platform = request.data.get('platform')
@@ -113,29 +179,112 @@ def get_optimal_time(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        system_prompt = f"""You are a social media timing expert. Suggest the best posting time for {platform} in {timezone} timezone.
-Consider:
-- Peak user activity periods
-- Target audience behavior
-- Platform-specific algorithms
-- Day of the week variations
-Return a JSON object with suggested times and brief explanations."""
-
-        completion = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"What are the best posting times for {platform} in {timezone}?"}
-            ],
-            temperature=0.7,
-            max_tokens=200,
-            response_format={"type": "json_object"}
-        )
+        suggestions, result = generate_optimal_time(platform, timezone)
+        if request.user.is_authenticated:
+            metering.record(request.user.id, "optimal_time", result['tokens_used'])
 
-        return Response(json.loads(completion.choices[0].message.content))
+        return Response(suggestions)
 
     except Exception as e:
         return Response(
             {'error': str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        ) 
\ No newline at end of file
+        )
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    return Response(cache.stats())
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, WithinAIQuota])
+def submit_job(request):
+    """
+    Queue a caption, hashtag or optimal-time generation on the AI workers.
+    Expects:
+    {
+        "type": "caption" | "hashtags" | "optimal_time",
+        "params": {...same fields as the synchronous endpoint...},
+        "callback_url": "https://example.com/hook"  (optional)
+    }
+    """
+    job_type = request.data.get('type')
+    params = request.data.get('params', {})
+    callback_url = request.data.get('callback_url')
+
+    if job_type == 'caption':
+        serializer = CaptionGenerateSerializer(data=params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+
+        media_url = None
+        if data.get('media_id'):
+            try:
+                media = Media.objects.get(id=data['media_id'], user=request.user)
+                media_url = request.build_absolute_uri(media.file.url)
+            except Media.DoesNotExist:
+                return Response(
+                    {'error': 'Media not found or does not belong to this user.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+        job_params = {
+            'prompt': data['prompt'],
+            'platform': data['platform'],
+            'tone': data['tone'],
+            'include_hashtags': data['include_hashtags'],
+            'hashtag_count': data.get('hashtag_count', 5),
+            'media_url': media_url,
+        }
+    elif job_type == 'hashtags':
+        serializer = HashtagGenerateSerializer(data=params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        job_params = dict(serializer.validated_data)
+    elif job_type == 'optimal_time':
+        if not params.get('platform') or not params.get('timezone'):
+            return Response(
+                {'error': 'Missing required fields'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        job_params = {'platform': params['platform'], 'timezone': params['timezone']}
+    else:
+        return Response(
+            {'error': 'type must be one of caption, hashtags or optimal_time'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if callback_url and not is_valid_callback_url(callback_url):
+        return Response(
+            {'error': 'callback_url must be a public http(s) URL'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    job = run_ai_job.delay(job_type, job_params, callback_url, user_id=request.user.id)
+    remember_job_owner(job.id, request.user.id)
+
+    return Response({
+        'job_id': job.id,
+        'status': 'queued',
+        'status_url': request.build_absolute_uri(f'{job.id}/'),
+    }, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def job_status(request, job_id):
+    if get_job_owner(job_id) != request.user.id:
+        return Response({'error': 'Job not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+    result = AsyncResult(job_id)
+    if result.successful():
+        return Response(result.result)
+    if result.failed():
+        return Response({'job_id': job_id, 'status': 'failed', 'error': str(result.result)})
+
+    return Response({
+        'job_id': job_id,
+        'status': 'running' if result.state == 'STARTED' else 'queued',
+    })
@@ -76,6 +76,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "drf_spectacular",
     "account",
     "posts",
@@ -244,15 +245,100 @@ CORS_ALLOW_HEADERS = [
     'x-requested-with',
 ]
 
-OPENAI_API_KEY = env('OPENAI_API_KEY')
+OPENAI_API_KEY = env('OPENAI_API_KEY', default='')
+OPENAI_TIMEOUT = env.float('OPENAI_TIMEOUT', default=30.0)
+OPENAI_CONNECT_TIMEOUT = env.float('OPENAI_CONNECT_TIMEOUT', default=5.0)
+OPENAI_MAX_RETRIES = env.int('OPENAI_MAX_RETRIES', default=2)
+OPENAI_MAX_CONNECTIONS = env.int('OPENAI_MAX_CONNECTIONS', default=100)
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = env.int('OPENAI_MAX_KEEPALIVE_CONNECTIONS', default=20)
+OPENAI_KEEPALIVE_EXPIRY = env.float('OPENAI_KEEPALIVE_EXPIRY', default=60.0)
+
+# AI generation cache
+AI_CACHE_TTL = env.int('AI_CACHE_TTL', default=24 * 60 * 60)
+AI_CACHE_MAX_ENTRIES = env.int('AI_CACHE_MAX_ENTRIES', default=10000)
+
+# "openai", "local" (deterministic offline stand-in) or a dotted path to a CompletionBackend
+AI_BACKEND = env('AI_BACKEND', default='openai')
+AI_LOCAL_LATENCY = env.float('AI_LOCAL_LATENCY', default=0.0)
+AI_LOCAL_TOKEN_LATENCY = env.float('AI_LOCAL_TOKEN_LATENCY', default=0.0)
+
+# Monthly AI token allowance for users without a subscription; 0 for unlimited
+AI_DEFAULT_MONTHLY_TOKENS = env.int('AI_DEFAULT_MONTHLY_TOKENS', default=0)
+
+REDIS_URL = env("REDIS_URL")
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL,
+    }
+}
 
 # Celery settings
-CELERY_BROKER_URL = env("REDIS_URL")
-CELERY_RESULT_BACKEND = env("REDIS_URL")
+CELERY_BROKER_URL = REDIS_URL
+CELERY_RESULT_BACKEND = REDIS_URL
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "UTC"
+CELERY_TASK_TRACK_STARTED = True
+CELERY_TASK_ROUTES = {
+    "posts.tasks.build_post_renditions_task": {"queue": "renditions"},
+    "ai_services.tasks.*": {"queue": "ai"},
+}
+CELERY_BEAT_SCHEDULE = {
+    "flush-link-clicks": {
+        "task": "posts.tasks.flush_link_clicks_task",
+        "schedule": 30.0,
+    },
+    "flush-ai-usage": {
+        "task": "ai_services.tasks.flush_ai_usage_task",
+        "schedule": 60.0,
+    },
+    "refresh-related-hashtags": {
+        "task": "content.tasks.refresh_related_hashtags_task",
+        "schedule": 5 * 60.0,
+    },
+    "rebuild-related-hashtags": {
+        "task": "content.tasks.refresh_related_hashtags_task",
+        "schedule": 24 * 60 * 60.0,
+        "kwargs": {"full": True},
+    },
+    "refresh-trending-hashtags": {
+        "task": "content.tasks.refresh_trending_hashtags_task",
+        "schedule": 5 * 60.0,
+    },
+    "refresh-hashtag-stats": {
+        "task": "content.tasks.refresh_hashtag_stats_task",
+        "schedule": 60.0,
+    },
+    "refresh-hashtag-metrics": {
+        "task": "content.tasks.refresh_hashtag_metrics_task",
+        "schedule": 60 * 60.0,
+    },
+    "refresh-social-tokens": {
+        "task": "posts.tasks.refresh_social_tokens_task",
+        "schedule": 15 * 60.0,
+    },
+}
+
+# Provider circuit breakers
+CIRCUIT_BREAKER = {
+    "FAILURE_THRESHOLD": env.int("CIRCUIT_FAILURE_THRESHOLD", default=5),
+    "WINDOW": env.int("CIRCUIT_WINDOW", default=60),
+    "RESET_TIMEOUT": env.int("CIRCUIT_RESET_TIMEOUT", default=60),
+    "HALF_OPEN_PROBES": env.int("CIRCUIT_HALF_OPEN_PROBES", default=2),
+}
+
+# Social token refresh
+TOKEN_REFRESH_WINDOW_HOURS = env.int("TOKEN_REFRESH_WINDOW_HOURS", default=24)
+TOKEN_REFRESH_CONCURRENCY = env.int("TOKEN_REFRESH_CONCURRENCY", default=8)
+
+# Image renditions
+RENDITION_WORKERS = env.int("RENDITION_WORKERS", default=2)
+
+# Short links
+SHORT_LINK_BASE_URL = env("SHORT_LINK_BASE_URL", default="http://localhost:8000/l/")
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -17,6 +17,7 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include
+from posts.views import short_link_redirect
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularRedocView,
@@ -40,4 +41,5 @@ urlpatterns = [
     path('api/content/', include('content.urls')),
     path('api/analytics/', include('analytics.urls')),
     path('api/ai/', include('ai_services.urls')),
+    path('l/<str:code>', short_link_redirect, name='short-link'),
 ]
@@ -0,0 +1,202 @@
+import bisect
+import heapq
+import logging
+import threading
+import time
+
+from django.db import connection
+
+from auth.redis_client import get_redis
+from .models import Hashtag
+
+logger = logging.getLogger(__name__)
+
+# Bumped on every hashtag write so each process knows to pull the changed rows
+VERSION_KEY = "hashtag_index:version"
+# Bumped on deletes, which cannot be picked up incrementally, to force a rebuild
+EPOCH_KEY = "hashtag_index:epoch"
+
+# How often a process checks Redis for changes; between checks lookups never leave memory
+CHECK_INTERVAL = 1.0
+# Past this many changed rows a rebuild is cheaper than inserting them one by one
+MAX_INCREMENTAL_ROWS = 2000
+
+FIELDS = ('id', 'name', 'post_count', 'engagement_rate', 'last_updated')
+
+MAX_LIMIT = 50
+# Prefixes this short match a large share of all hashtags, so their rankings are memoized
+MEMO_PREFIX_LENGTH = 2
+
+
+def mark_changed(deleted=False):
+    try:
+        get_redis().incr(EPOCH_KEY if deleted else VERSION_KEY)
+    except Exception as e:
+        logger.warning(f"Could not mark hashtag index as changed: {str(e)}")
+
+
+class HashtagIndex:
+    """
+    Per-process prefix index over hashtag names.
+
+    Names are kept sorted, so the hashtags sharing a prefix form one contiguous
+    slice found with bisect. That slice is ranked by post count, then engagement
+    rate. Changes are pulled incrementally using the last_updated watermark.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []
+        self._entries = {}
+        self._names_by_id = {}
+        self._memo = {}
+        self._watermark = None
+        self._version = None
+        self._epoch = None
+        self._checked_at = 0.0
+        self._building = False
+        self.ready = False
+
+    def _entry(self, row):
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'post_count': row['post_count'],
+            'engagement_rate': row['engagement_rate'],
+        }
+
+    def _versions(self):
+        version, epoch = get_redis().mget(VERSION_KEY, EPOCH_KEY)
+        return version, epoch
+
+    def build(self):
+        version, epoch = self._versions()
+        rows = list(Hashtag.objects.values(*FIELDS).iterator(chunk_size=5000))
+
+        entries = {}
+        names_by_id = {}
+        for row in rows:
+            key = row['name'].lower()
+            entries[key] = self._entry(row)
+            names_by_id[row['id']] = key
+        watermark = max((row['last_updated'] for row in rows), default=None)
+
+        with self._lock:
+            self._keys = sorted(entries)
+            self._entries = entries
+            self._names_by_id = names_by_id
+            self._memo = {}
+            self._watermark = watermark
+            self._version, self._epoch = version, epoch
+            self._checked_at = time.monotonic()
+            self.ready = True
+
+    def _apply(self, rows):
+        with self._lock:
+            self._memo = {}
+            for row in rows:
+                key = row['name'].lower()
+                previous = self._names_by_id.get(row['id'])
+                if previous is not None and previous != key:
+                    # Renamed: drop the old name from the sorted keys
+                    index = bisect.bisect_left(self._keys, previous)
+                    if index < len(self._keys) and self._keys[index] == previous:
+                        del self._keys[index]
+                    self._entries.pop(previous, None)
+                is_new = key not in self._entries
+                # Entries first, so a concurrent search never sees a key without one
+                self._entries[key] = self._entry(row)
+                if is_new:
+                    bisect.insort(self._keys, key)
+                self._names_by_id[row['id']] = key
+                if self._watermark is None or row['last_updated'] > self._watermark:
+                    self._watermark = row['last_updated']
+
+    def refresh(self):
+        """Bring the index up to date if another process or request changed hashtags."""
+        if time.monotonic() - self._checked_at < CHECK_INTERVAL:
+            return
+        self._checked_at = time.monotonic()
+
+        version, epoch = self._versions()
+        if epoch != self._epoch:
+            self.build()
+            return
+        if version == self._version:
+            return
+
+        changed = Hashtag.objects.values(*FIELDS).order_by('last_updated')
+        if self._watermark is not None:
+            # >= because several rows can share the watermark timestamp; re-applying them is harmless
+            changed = changed.filter(last_updated__gte=self._watermark)
+        rows = list(changed[:MAX_INCREMENTAL_ROWS + 1])
+        if len(rows) > MAX_INCREMENTAL_ROWS:
+            self.build()
+            return
+
+        self._apply(rows)
+        self._version = version
+
+    def build_in_background(self):
+        with self._lock:
+            if self._building or self.ready:
+                return
+            self._building = True
+
+        def run():
+            try:
+                self.build()
+            except Exception as e:
+                logger.error(f"Error building hashtag index: {str(e)}")
+            finally:
+                self._building = False
+                connection.close()
+
+        threading.Thread(target=run, name="hashtag-index", daemon=True).start()
+
+    def _rank(self, prefix, limit):
+        keys = self._keys
+        start = bisect.bisect_left(keys, prefix)
+        end = bisect.bisect_left(keys, prefix + '\uffff', lo=start)
+        entries = self._entries
+        return heapq.nlargest(
+            limit,
+            (entries[key] for key in keys[start:end]),
+            key=lambda entry: (entry['post_count'], entry['engagement_rate'])
+        )
+
+    def search(self, prefix, limit):
+        if len(prefix) > MEMO_PREFIX_LENGTH:
+            return self._rank(prefix, limit)
+
+        memo = self._memo
+        ranked = memo.get(prefix)
+        if ranked is None:
+            ranked = memo[prefix] = self._rank(prefix, MAX_LIMIT)
+        return ranked[:limit]
+
+
+index = HashtagIndex()
+
+
+def _search_database(prefix, limit):
+    """Fallback while the in-memory index is unavailable; served by the name pattern index."""
+    return list(
+        Hashtag.objects.filter(name__startswith=prefix)
+        .order_by('-post_count', '-engagement_rate')
+        .values('id', 'name', 'post_count', 'engagement_rate')[:limit]
+    )
+
+
+def suggest(prefix, limit=10):
+    """Hashtags starting with prefix, most used first."""
+    if not index.ready:
+        index.build_in_background()
+        return _search_database(prefix, limit)
+
+    try:
+        index.refresh()
+    except Exception as e:
+        # A stale index is still a useful one
+        logger.warning(f"Could not refresh hashtag index: {str(e)}")
+    return index.search(prefix, limit)
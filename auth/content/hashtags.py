@@ -0,0 +1,71 @@
+import re
+
+from . import related, stats
+from .autocomplete import mark_changed
+from .models import Hashtag, HashtagGroup
+
+HASHTAG_MAX_LENGTH = Hashtag._meta.get_field('name').max_length
+HASHTAG_RE = re.compile(r'#(\w+)')
+
+
+def normalize_hashtag(name):
+    """Canonical form of a hashtag name: no leading '#', no surrounding spaces, lowercase."""
+    if not isinstance(name, str):
+        return ''
+    name = name.strip().lstrip('#').strip().lower()
+    if ' ' in name or len(name) > HASHTAG_MAX_LENGTH:
+        return ''
+    return name
+
+
+def normalize_hashtags(names):
+    """Normalized, de-duplicated names in their original order; invalid names are dropped."""
+    seen = set()
+    normalized = []
+    for name in names:
+        name = normalize_hashtag(name)
+        if name and name not in seen:
+            seen.add(name)
+            normalized.append(name)
+    return normalized
+
+
+def resolve_hashtags(names):
+    """
+    Return Hashtag rows for the given names, creating any that are missing.
+    Runs in two queries whatever the number of names; results keep the input order.
+    """
+    names = normalize_hashtags(names)
+    if not names:
+        return []
+
+    Hashtag.objects.bulk_create([Hashtag(name=name) for name in names], ignore_conflicts=True)
+    # bulk_create sends no signals, so tell the autocomplete indexes directly
+    mark_changed()
+    by_name = {hashtag.name: hashtag for hashtag in Hashtag.objects.filter(name__in=names)}
+    return [by_name[name] for name in names if name in by_name]
+
+
+def add_hashtags_to_group(group, hashtags):
+    """Link hashtags to a group with a single insert, skipping links that already exist."""
+    through = HashtagGroup.hashtags.through
+    through.objects.bulk_create(
+        [through(hashtaggroup_id=group.id, hashtag_id=hashtag.id) for hashtag in hashtags],
+        ignore_conflicts=True
+    )
+    # Every member of the group now co-occurs with the new tags
+    related.mark_dirty(through.objects.filter(hashtaggroup_id=group.id).values_list('hashtag_id', flat=True))
+    stats.mark_users_dirty([group.user_id])
+
+
+def set_group_hashtags(group, hashtags):
+    """Replace a group's hashtags: one delete and one insert."""
+    links = HashtagGroup.hashtags.through.objects.filter(hashtaggroup_id=group.id)
+    related.mark_dirty(links.values_list('hashtag_id', flat=True))
+    links.delete()
+    add_hashtags_to_group(group, hashtags)
+
+
+def extract_hashtags(text):
+    """Normalized hashtags used in a piece of text, in order of first use."""
+    return normalize_hashtags(HASHTAG_RE.findall(text or ''))
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from content import similarity
+from content.models import Caption
+from posts.models import Post
+
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Indexes saved captions and recent posts for near-duplicate detection'
+
+    def _index(self, queryset, kind, text_field):
+        last_id = 0
+        indexed = 0
+        while True:
+            chunk = list(
+                queryset.filter(id__gt=last_id).order_by('id').values_list('id', 'user_id', text_field)[:CHUNK_SIZE]
+            )
+            if not chunk:
+                break
+            for object_id, user_id, text in chunk:
+                similarity.index(kind, object_id, user_id, text)
+            indexed += len(chunk)
+            last_id = chunk[-1][0]
+        return indexed
+
+    def handle(self, *args, **options):
+        captions = self._index(Caption.objects.filter(is_saved=True), 'caption', 'text')
+        since = timezone.now() - timedelta(seconds=similarity.POST_TTL)
+        posts = self._index(Post.objects.filter(created_at__gte=since), 'post', 'content')
+        self.stdout.write(self.style.SUCCESS(f"Indexed {captions} captions and {posts} posts."))
@@ -0,0 +1,175 @@
+import logging
+
+import numpy as np
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from posts.models import PostHashtag, PostMetrics
+from posts.renditions import platform_for_provider
+from .autocomplete import mark_changed
+from .models import Hashtag, HashtagPlatformStats
+from .stats import mark_hashtags_changed
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+QUEUED_KEY = "hashtag_metrics:queued"
+QUEUED_TTL = 30 * 60
+
+# growth_rate and is_trending come from measured activity in content/trends.py
+METRIC_FIELDS = ['post_count', 'engagement_rate', 'last_updated']
+
+ENGAGEMENT_FIELDS = ('likes', 'comments', 'shares', 'saves', 'clicks')
+
+
+def attribute(hashtag_ids):
+    """
+    Measured engagement for a batch of hashtags, from PostMetrics of the published
+    posts that used them.
+
+    Every metrics row is credited in full to each hashtag of its post. Rates are
+    total engagements over total impressions (reach when a platform reports no
+    impressions), so heavily seen posts weigh more than a handful of tiny ones.
+    Returns (post counts by hashtag id, {(hashtag id, platform): stats}).
+    """
+    links = np.array(
+        list(
+            PostHashtag.objects.filter(hashtag_id__in=hashtag_ids, post__status='published')
+            .values_list('post_id', 'hashtag_id')
+        ),
+        dtype=np.int64
+    ).reshape(-1, 2)
+    if not len(links):
+        return {}, {}
+    post_counts = dict(zip(*(array.tolist() for array in np.unique(links[:, 1], return_counts=True))))
+
+    rows = list(
+        PostMetrics.objects.filter(post_id__in=np.unique(links[:, 0]).tolist())
+        .values_list('post_id', 'platform_post__social_app__provider', 'impressions', 'reach', *ENGAGEMENT_FIELDS)
+    )
+    return post_counts, _aggregate(links, rows)
+
+
+def _aggregate(links, rows):
+    """Sum metrics rows per (hashtag, platform); links is an array of (post_id, hashtag_id) rows."""
+    if not rows:
+        return {}
+
+    metric_posts = np.array([row[0] for row in rows], dtype=np.int64)
+    platforms, platform_codes = np.unique(
+        [platform_for_provider(row[1]) for row in rows], return_inverse=True
+    )
+    numbers = np.array([row[2:] for row in rows], dtype=np.int64)
+    impressions = np.where(numbers[:, 0] > 0, numbers[:, 0], numbers[:, 1])
+    engagements = numbers[:, 2:].sum(axis=1)
+
+    # Join: each metrics row against every hashtag link of its post
+    links = links[np.argsort(links[:, 0], kind='stable')]
+    starts = np.searchsorted(links[:, 0], metric_posts, side='left')
+    ends = np.searchsorted(links[:, 0], metric_posts, side='right')
+    repeats = ends - starts
+    row_index = np.repeat(np.arange(len(rows)), repeats)
+    link_index = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats) + np.repeat(starts, repeats)
+
+    hashtags = links[link_index, 1]
+    groups, group_index = np.unique(
+        np.stack([hashtags, platform_codes[row_index]], axis=1), axis=0, return_inverse=True
+    )
+    group_index = group_index.ravel()
+    group_impressions = np.bincount(group_index, weights=impressions[row_index], minlength=len(groups))
+    group_engagements = np.bincount(group_index, weights=engagements[row_index], minlength=len(groups))
+    group_posts = np.unique(np.stack([group_index, metric_posts[row_index]], axis=1), axis=0)
+    group_post_counts = np.bincount(group_posts[:, 0], minlength=len(groups))
+
+    stats = {}
+    for (hashtag_id, platform_code), posts, seen, engaged in zip(
+        groups.tolist(), group_post_counts.tolist(), group_impressions.tolist(), group_engagements.tolist()
+    ):
+        stats[(hashtag_id, str(platforms[platform_code]))] = {
+            'posts': posts,
+            'impressions': int(seen),
+            'engagements': int(engaged),
+        }
+    return stats
+
+
+def _engagement_rate(engagements, impressions):
+    return round(engagements / impressions * 100, 4) if impressions else 0.0
+
+
+def _apply_attribution(hashtags, now):
+    ids = [hashtag.id for hashtag in hashtags]
+    post_counts, stats = attribute(ids)
+
+    totals = {}
+    for (hashtag_id, _), values in stats.items():
+        total = totals.setdefault(hashtag_id, [0, 0])
+        total[0] += values['engagements']
+        total[1] += values['impressions']
+
+    for hashtag in hashtags:
+        engaged, seen = totals.get(hashtag.id, (0, 0))
+        hashtag.post_count = int(post_counts.get(hashtag.id, 0))
+        hashtag.engagement_rate = _engagement_rate(engaged, seen)
+        # bulk_update does not apply auto_now
+        hashtag.last_updated = now
+
+    with transaction.atomic():
+        Hashtag.objects.bulk_update(hashtags, METRIC_FIELDS)
+        HashtagPlatformStats.objects.filter(hashtag_id__in=ids).delete()
+        HashtagPlatformStats.objects.bulk_create([
+            HashtagPlatformStats(
+                hashtag_id=hashtag_id,
+                platform=platform,
+                engagement_rate=_engagement_rate(values['engagements'], values['impressions']),
+                **values
+            )
+            for (hashtag_id, platform), values in stats.items()
+        ])
+
+
+def refresh_hashtag_metrics(batch_size=BATCH_SIZE, limit=None):
+    """
+    Refresh measured hashtag metrics, stalest first.
+
+    Walks the table in keyset-paginated chunks ordered by (last_updated, id), so each
+    chunk is an index range scan and the whole pass is linear in the table size.
+    Rows refreshed during this pass move past the start time and are not revisited.
+    Returns the number of hashtags refreshed.
+    """
+    started_at = timezone.now()
+    refreshed = 0
+    cursor = None
+
+    while limit is None or refreshed < limit:
+        chunk = Hashtag.objects.filter(last_updated__lt=started_at)
+        if cursor is not None:
+            chunk = chunk.filter(
+                Q(last_updated__gt=cursor[0]) | Q(last_updated=cursor[0], id__gt=cursor[1])
+            )
+        size = batch_size if limit is None else min(batch_size, limit - refreshed)
+        hashtags = list(chunk.order_by('last_updated', 'id')[:size])
+        if not hashtags:
+            break
+
+        cursor = (hashtags[-1].last_updated, hashtags[-1].id)
+        _apply_attribution(hashtags, timezone.now())
+        mark_hashtags_changed([hashtag.id for hashtag in hashtags])
+        refreshed += len(hashtags)
+
+    if refreshed:
+        # bulk_update sends no signals
+        mark_changed()
+    return refreshed
+
+
+def queue_refresh():
+    """Enqueue a refresh unless one is already waiting; returns whether this call queued it."""
+    from .tasks import refresh_hashtag_metrics_task
+
+    if not cache.add(QUEUED_KEY, True, timeout=QUEUED_TTL):
+        return False
+    refresh_hashtag_metrics_task.delay()
+    return True
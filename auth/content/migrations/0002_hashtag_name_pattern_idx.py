@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hashtag',
+            index=models.Index(fields=['name'], name='hashtag_name_pattern_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0002_hashtag_name_pattern_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedHashtag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('co_occurrences', models.PositiveIntegerField()),
+                ('lift', models.FloatField()),
+                ('pmi', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='content.hashtag')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='content.hashtag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hashtag', '-pmi'], name='relatedhashtag_rank_idx')],
+                'unique_together': {('hashtag', 'related')},
+            },
+        ),
+    ]
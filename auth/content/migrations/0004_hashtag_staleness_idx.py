@@ -0,0 +1,17 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0003_relatedhashtag'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hashtag',
+            index=models.Index(fields=['last_updated', 'id'], name='hashtag_staleness_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0005_userhashtagstat'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HashtagPlatformStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=30)),
+                ('posts', models.PositiveIntegerField(default=0)),
+                ('impressions', models.PositiveBigIntegerField(default=0)),
+                ('engagements', models.PositiveBigIntegerField(default=0)),
+                ('engagement_rate', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='platform_stats', to='content.hashtag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['platform', '-engagement_rate'], name='hashtagstats_platform_rank_idx')],
+                'unique_together': {('hashtag', 'platform')},
+            },
+        ),
+    ]
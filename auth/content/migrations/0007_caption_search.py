@@ -0,0 +1,34 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:57
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0006_hashtagplatformstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='caption',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.SearchVector('text', config='english'), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='caption',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='caption_search_vector_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='caption',
+            index=models.Index(fields=['user', 'is_saved', '-created_at', '-id'], name='caption_library_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='caption',
+            index=models.Index(fields=['user', 'is_saved', 'platform', '-created_at', '-id'], name='caption_library_platform_idx'),
+        ),
+    ]
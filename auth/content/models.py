@@ -1,3 +1,5 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.conf import settings
 
@@ -18,6 +20,19 @@ class Caption(models.Model):
     is_saved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Maintained by Postgres from text, for ranked full-text search of the caption library
+    search_vector = models.GeneratedField(
+        expression=SearchVector('text', config='english'),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='caption_search_vector_idx'),
+            models.Index(fields=['user', 'is_saved', '-created_at', '-id'], name='caption_library_idx'),
+            models.Index(fields=['user', 'is_saved', 'platform', '-created_at', '-id'], name='caption_library_platform_idx'),
+        ]
     
     def __str__(self):
         return f"Caption by {self.user.email} for {self.platform}"
@@ -30,11 +45,58 @@ class Hashtag(models.Model):
     engagement_rate = models.FloatField(default=0.0)  # Engagement rate in percentage
     is_trending = models.BooleanField(default=False)
     last_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Prefix lookups (name LIKE 'abc%') for autocomplete when the in-memory index is not ready
+            models.Index(fields=['name'], name='hashtag_name_pattern_idx', opclasses=['varchar_pattern_ops']),
+            # Keyset walk of the metrics refresh job, stalest first
+            models.Index(fields=['last_updated', 'id'], name='hashtag_staleness_idx'),
+        ]
     
     def __str__(self):
         return self.name
 
 
+class HashtagPlatformStats(models.Model):
+    """Engagement measured on our own published posts that used a hashtag, per platform."""
+    hashtag = models.ForeignKey(Hashtag, on_delete=models.CASCADE, related_name='platform_stats')
+    platform = models.CharField(max_length=30)
+    posts = models.PositiveIntegerField(default=0)
+    impressions = models.PositiveBigIntegerField(default=0)
+    engagements = models.PositiveBigIntegerField(default=0)
+    engagement_rate = models.FloatField(default=0.0)  # Engagement rate in percentage
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('hashtag', 'platform')
+        indexes = [
+            models.Index(fields=['platform', '-engagement_rate'], name='hashtagstats_platform_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.hashtag.name} on {self.platform}: {self.engagement_rate:.2f}%"
+
+
+class RelatedHashtag(models.Model):
+    """Top co-occurring hashtags for a hashtag, precomputed from groups and published posts."""
+    hashtag = models.ForeignKey(Hashtag, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(Hashtag, on_delete=models.CASCADE, related_name='+')
+    co_occurrences = models.PositiveIntegerField()
+    lift = models.FloatField()
+    pmi = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('hashtag', 'related')
+        indexes = [
+            models.Index(fields=['hashtag', '-pmi'], name='relatedhashtag_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.hashtag.name} -> {self.related.name} ({self.pmi:.2f})"
+
+
 class HashtagGroup(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='hashtag_groups')
     name = models.CharField(max_length=100)
@@ -50,6 +112,31 @@ class HashtagGroup(models.Model):
         return f"{self.name} by {self.user.email}"
 
 
+class UserHashtagStat(models.Model):
+    """
+    A user's hashtags ranked per performance category, materialized from their
+    hashtag groups so the performance panel is a single indexed read.
+    """
+    CATEGORY_CHOICES = (
+        ('top', 'Top Performing'),
+        ('trending', 'Trending'),
+        ('growing', 'Growing'),
+        ('underperforming', 'Underperforming'),
+    )
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='hashtag_stats')
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
+    rank = models.PositiveSmallIntegerField()
+    hashtag = models.ForeignKey(Hashtag, on_delete=models.CASCADE, related_name='+')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'category', 'rank')
+
+    def __str__(self):
+        return f"{self.user.email} {self.category} #{self.rank}: {self.hashtag.name}"
+
+
 class Media(models.Model):
     TYPE_CHOICES = (
         ('image', 'Image'),
@@ -0,0 +1,18 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CaptionCursorPagination(CursorPagination):
+    """
+    Newest first, or best match first when the view is searching.
+    Cursors keep pages stable while captions are added and never need a COUNT.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+    search_ordering = ('-rank', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        if getattr(view, 'search_query', None):
+            return self.search_ordering
+        return super().get_ordering(request, queryset, view)
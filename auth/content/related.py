@@ -0,0 +1,172 @@
+import logging
+
+import numpy as np
+from django.db import transaction
+
+from auth.redis_client import get_redis
+from posts.models import PostHashtag
+from .models import HashtagGroup, RelatedHashtag
+
+logger = logging.getLogger(__name__)
+
+TOP_K = 20
+# Pairs seen fewer times than this are noise; PMI overrates them
+MIN_CO_OCCURRENCES = 2
+# Very large groups say little about which tags belong together and their pairs grow quadratically
+MAX_DOCUMENT_TAGS = 50
+
+DIRTY_KEY = "related_hashtags:dirty"
+DIRTY_FLUSH_KEY = "related_hashtags:refreshing"
+
+
+def mark_dirty(hashtag_ids):
+    """Queue hashtags whose co-occurrences changed for the next incremental refresh."""
+    hashtag_ids = list(hashtag_ids)
+    if not hashtag_ids:
+        return
+    try:
+        get_redis().sadd(DIRTY_KEY, *hashtag_ids)
+    except Exception as e:
+        logger.warning(f"Could not mark related hashtags for refresh: {str(e)}")
+
+
+def load_documents():
+    """
+    Sets of hashtag ids that were used together: one per hashtag group and one
+    per published post.
+    """
+    documents = {}
+    through = HashtagGroup.hashtags.through
+    for group_id, hashtag_id in through.objects.values_list('hashtaggroup_id', 'hashtag_id').iterator(chunk_size=10000):
+        documents.setdefault(('group', group_id), set()).add(hashtag_id)
+
+    published = PostHashtag.objects.filter(post__status='published').values_list('post_id', 'hashtag_id')
+    for post_id, hashtag_id in published.iterator(chunk_size=10000):
+        documents.setdefault(('post', post_id), set()).add(hashtag_id)
+
+    return [sorted(tags)[:MAX_DOCUMENT_TAGS] for tags in documents.values()]
+
+
+def _pairs(documents, vocabulary):
+    """Every ordered (a, b) pair of column indexes that share a document, built per document length."""
+    by_length = {}
+    for tags in documents:
+        if len(tags) > 1:
+            by_length.setdefault(len(tags), []).append(tags)
+
+    firsts, seconds = [], []
+    for length, docs in by_length.items():
+        columns = np.searchsorted(vocabulary, np.array(docs, dtype=np.int64))
+        i, j = np.nonzero(~np.eye(length, dtype=bool))
+        firsts.append(columns[:, i].ravel())
+        seconds.append(columns[:, j].ravel())
+
+    if not firsts:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(firsts), np.concatenate(seconds)
+
+
+def score(documents, targets=None):
+    """
+    Top-k related hashtags by pointwise mutual information.
+
+    Pair counts are held sparsely as encoded (a, b) keys counted with
+    np.unique. When targets is given, only pairs whose first hashtag is a
+    target are scored, but the marginal counts always cover every document.
+    Returns (hashtag_ids, related_ids, co_occurrences, lift, pmi) arrays.
+    """
+    empty = tuple(np.empty(0) for _ in range(5))
+    documents = [tags for tags in documents if tags]
+    if not documents:
+        return empty
+
+    vocabulary = np.unique(np.concatenate([np.array(tags, dtype=np.int64) for tags in documents]))
+    size = len(vocabulary)
+    tag_counts = np.bincount(
+        np.searchsorted(vocabulary, np.concatenate([np.array(tags, dtype=np.int64) for tags in documents])),
+        minlength=size
+    )
+
+    firsts, seconds = _pairs(documents, vocabulary)
+    if targets is not None:
+        keep = np.isin(vocabulary[firsts], np.array(list(targets), dtype=np.int64))
+        firsts, seconds = firsts[keep], seconds[keep]
+    if not len(firsts):
+        return empty
+
+    keys, co_occurrences = np.unique(firsts * size + seconds, return_counts=True)
+    keep = co_occurrences >= MIN_CO_OCCURRENCES
+    keys, co_occurrences = keys[keep], co_occurrences[keep]
+    firsts, seconds = keys // size, keys % size
+
+    lift = co_occurrences * len(documents) / (tag_counts[firsts] * tag_counts[seconds])
+    pmi = np.log(lift)
+
+    # Group by hashtag, best first, then keep each group's first TOP_K rows
+    order = np.lexsort((-co_occurrences, -pmi, firsts))
+    firsts, seconds = firsts[order], seconds[order]
+    co_occurrences, lift, pmi = co_occurrences[order], lift[order], pmi[order]
+    group_starts = np.searchsorted(firsts, firsts, side='left')
+    top = (np.arange(len(firsts)) - group_starts) < TOP_K
+
+    return (
+        vocabulary[firsts[top]],
+        vocabulary[seconds[top]],
+        co_occurrences[top],
+        lift[top],
+        pmi[top],
+    )
+
+
+def refresh(full=False):
+    """
+    Rewrite RelatedHashtag rows.
+    Incremental runs only rescore hashtags marked dirty since the last run; a full
+    run rescores everything and also catches the drift in marginal counts.
+    """
+    targets = None
+    client = get_redis()
+    if not full:
+        if not client.exists(DIRTY_FLUSH_KEY):
+            try:
+                client.rename(DIRTY_KEY, DIRTY_FLUSH_KEY)
+            except Exception:
+                # Nothing changed since the last refresh
+                return 0
+        targets = {int(member) for member in client.smembers(DIRTY_FLUSH_KEY)}
+
+    hashtag_ids, related_ids, co_occurrences, lift, pmi = score(load_documents(), targets)
+
+    with transaction.atomic():
+        stale = RelatedHashtag.objects.all()
+        if targets is not None:
+            stale = stale.filter(hashtag_id__in=targets)
+        stale.delete()
+        RelatedHashtag.objects.bulk_create(
+            [
+                RelatedHashtag(
+                    hashtag_id=int(hashtag_id),
+                    related_id=int(related_id),
+                    co_occurrences=int(count),
+                    lift=float(lift_value),
+                    pmi=float(pmi_value),
+                )
+                for hashtag_id, related_id, count, lift_value, pmi_value
+                in zip(hashtag_ids, related_ids, co_occurrences, lift, pmi)
+            ],
+            batch_size=2000
+        )
+
+    if not full:
+        client.delete(DIRTY_FLUSH_KEY)
+    return len(hashtag_ids)
+
+
+def related_hashtags(name, limit=10):
+    """Precomputed related hashtags for a hashtag name, best first; empty for unseen tags."""
+    return [
+        link.related for link in
+        RelatedHashtag.objects.filter(hashtag__name=name)
+        .select_related('related')
+        .order_by('-pmi')[:limit]
+    ]
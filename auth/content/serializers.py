@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .hashtags import add_hashtags_to_group, resolve_hashtags, set_group_hashtags
 from .models import Caption, Hashtag, HashtagGroup, Media
 
 
@@ -47,9 +48,7 @@ class HashtagGroupSerializer(serializers.ModelSerializer):
         hashtag_group = HashtagGroup.objects.create(**validated_data)
         
         # Add hashtags to the group
-        for name in hashtag_names:
-            hashtag, created = Hashtag.objects.get_or_create(name=name.strip())
-            hashtag_group.hashtags.add(hashtag)
+        add_hashtags_to_group(hashtag_group, resolve_hashtags(hashtag_names))
         
         return hashtag_group
     
@@ -63,10 +62,7 @@ class HashtagGroupSerializer(serializers.ModelSerializer):
         
         # Update hashtags if provided
         if hashtag_names is not None:
-            instance.hashtags.clear()
-            for name in hashtag_names:
-                hashtag, created = Hashtag.objects.get_or_create(name=name.strip())
-                instance.hashtags.add(hashtag)
+            set_group_hashtags(instance, resolve_hashtags(hashtag_names))
         
         return instance
 
@@ -102,6 +98,25 @@ class CaptionGenerateSerializer(serializers.Serializer):
     media_id = serializers.IntegerField(required=False, allow_null=True)
 
 
+class CaptionVariantSerializer(serializers.Serializer):
+    platform = serializers.ChoiceField(choices=Caption.PLATFORM_CHOICES)
+    tone = serializers.CharField(required=False, default='professional')
+
+
+class CaptionBatchGenerateSerializer(serializers.Serializer):
+    prompt = serializers.CharField(required=False, allow_blank=True, default='')
+    variants = CaptionVariantSerializer(many=True, allow_empty=False, max_length=10)
+    include_hashtags = serializers.BooleanField(required=False, default=False)
+    hashtag_count = serializers.IntegerField(required=False, default=5, min_value=1, max_value=30)
+    media_id = serializers.IntegerField(required=False, allow_null=True)
+
+
+class SimilarCaptionQuerySerializer(serializers.Serializer):
+    text = serializers.CharField()
+    limit = serializers.IntegerField(required=False, default=5, min_value=1, max_value=20)
+    exclude_caption_id = serializers.IntegerField(required=False, allow_null=True)
+
+
 class HashtagGenerateSerializer(serializers.Serializer):
     query = serializers.CharField(required=True)
     platform = serializers.CharField(required=False, default='instagram')
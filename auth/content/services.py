@@ -0,0 +1,261 @@
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from ai_services.completions import complete
+from .hashtags import resolve_hashtags
+
+CAPTION_MODEL = "gpt-4o"
+CAPTION_MAX_TOKENS = 500
+CAPTION_BATCH_WORKERS = 6
+
+HASHTAG_MODEL = "gpt-4o"
+HASHTAG_MAX_TOKENS = 500
+
+HASHTAG_STOPWORDS = ['hashtags', 'tags', 'and', 'or', 'the', 'for']
+
+
+def build_caption_messages(prompt, platform, tone, include_hashtags, hashtag_count, media_url=None):
+    """Chat messages for a caption request; shared by the regular, streaming and queued endpoints."""
+    system_content = f"You are a professional social media copywriter. Create a compelling {platform} caption with a {tone} tone."
+    if include_hashtags:
+        system_content += f" Include {hashtag_count} relevant hashtags at the end."
+
+    return [
+        {"role": "system", "content": system_content},
+        {"role": "user", "content": caption_user_content(prompt, media_url)}
+    ]
+
+
+def caption_user_content(prompt, media_url=None):
+    if media_url:
+        if prompt:
+            return f"Write a caption about: {prompt}\n\nThis caption will accompany the image at: {media_url}"
+        return f"Write a caption for this image: {media_url}"
+    return f"Write a caption about: {prompt}"
+
+
+def extract_caption_hashtags(caption_text):
+    """Pull hashtags out of a generated caption, including lists written without the # symbol."""
+    hashtags = re.findall(r'#(\w+)', caption_text)
+
+    # If no hashtags were found with #, try looking for a list of hashtags
+    if not hashtags and "hashtag" in caption_text.lower():
+        potential_tags = re.findall(r'(?:hashtags?:?\s*|tags?:?\s*)([\w\s,]+)(?:\n|$)', caption_text.lower())
+        for tag_text in potential_tags:
+            for tag in re.findall(r'\b(\w+)\b', tag_text):
+                if tag and tag not in HASHTAG_STOPWORDS:
+                    hashtags.append(tag)
+
+    return hashtags
+
+
+def friendly_openai_error(error):
+    """Map common OpenAI failures to messages that make sense to end users."""
+    error_message = str(error)
+    if "api_key" in error_message.lower():
+        return "Invalid OpenAI API key. Please check your API configuration."
+    elif "rate limit" in error_message.lower():
+        return "OpenAI API rate limit exceeded. Please try again later."
+    elif "insufficient_quota" in error_message.lower():
+        return "OpenAI API quota exceeded. Please check your usage limits."
+    return error_message
+
+
+def generate_caption(prompt, platform, tone, include_hashtags, hashtag_count, media_url=None):
+    """
+    Generate a caption and the hashtags it contains.
+    Returns the completion dict from complete() with an extra `hashtags` list.
+    """
+    result = complete(
+        messages=build_caption_messages(prompt, platform, tone, include_hashtags, hashtag_count, media_url),
+        model=CAPTION_MODEL,
+        namespace="caption",
+        cache_scope=platform,
+        max_tokens=CAPTION_MAX_TOKENS
+    )
+    result["hashtags"] = (
+        extract_caption_hashtags(result["content"]) if include_hashtags and result["content"] else []
+    )
+    return result
+
+
+def build_caption_batch_messages(prompt, variants, include_hashtags, hashtag_count, media_url=None):
+    """One JSON-mode request that asks for every platform/tone variant at once."""
+    system_content = (
+        "You are a professional social media copywriter. Write one caption for each of the "
+        "numbered variants below, adapting length, style and formatting to each platform and tone."
+    )
+    if include_hashtags:
+        system_content += f" End each caption with {hashtag_count} relevant hashtags."
+    system_content += "\n\nVariants:\n" + "\n".join(
+        f"{index}. {variant['platform']} caption with a {variant['tone']} tone"
+        for index, variant in enumerate(variants)
+    )
+    system_content += (
+        '\n\nReturn ONLY a JSON object of the form '
+        '{"captions": [{"index": 0, "caption": "..."}]} with one entry per variant.'
+    )
+
+    # The prompt context is sent once for every variant
+    return [
+        {"role": "system", "content": system_content},
+        {"role": "user", "content": caption_user_content(prompt, media_url)}
+    ]
+
+
+def parse_caption_batch(content, variant_count):
+    """Captions by variant index from a batched completion; variants the model skipped are left out."""
+    try:
+        data = json.loads(content)
+    except (TypeError, json.JSONDecodeError):
+        return {}
+
+    entries = data.get('captions') if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        return {}
+
+    captions = {}
+    for position, entry in enumerate(entries):
+        if isinstance(entry, dict):
+            index, text = entry.get('index', position), entry.get('caption')
+        else:
+            index, text = position, entry
+        if isinstance(index, int) and 0 <= index < variant_count and isinstance(text, str) and text.strip():
+            captions[index] = text.strip()
+    return captions
+
+
+def split_batch_tokens(total_tokens, captions):
+    """
+    Apportion a batched completion's token count across its variants.
+    The API only reports usage per request, so each variant is charged in
+    proportion to the length of its caption.
+    """
+    lengths = [len(caption) for caption in captions]
+    total_length = sum(lengths) or 1
+    shares = [total_tokens * length // total_length for length in lengths]
+    if shares:
+        shares[-1] += total_tokens - sum(shares)
+    return shares
+
+
+def generate_caption_batch(prompt, variants, include_hashtags, hashtag_count, media_url=None):
+    """
+    Generate captions for several platform/tone variants of the same prompt.
+
+    All variants are requested from one structured completion. Any the model
+    fails to return are generated individually, concurrently. Returns a list of
+    dicts (platform, tone, content, hashtags, tokens_used, cached) in variant order.
+    """
+    def single(variant):
+        return generate_caption(
+            prompt, variant['platform'], variant['tone'], include_hashtags, hashtag_count, media_url
+        )
+
+    results = [None] * len(variants)
+
+    if len(variants) > 1:
+        batch = complete(
+            messages=build_caption_batch_messages(prompt, variants, include_hashtags, hashtag_count, media_url),
+            model=CAPTION_MODEL,
+            namespace="caption_batch",
+            max_tokens=CAPTION_MAX_TOKENS * len(variants),
+            response_format={"type": "json_object"}
+        )
+        captions = parse_caption_batch(batch["content"], len(variants))
+        indexes = sorted(captions)
+        for index, tokens_used in zip(indexes, split_batch_tokens(batch["tokens_used"], [captions[i] for i in indexes])):
+            results[index] = {
+                "content": captions[index],
+                "tokens_used": tokens_used,
+                "cached": batch["cached"],
+                "hashtags": extract_caption_hashtags(captions[index]) if include_hashtags else [],
+            }
+
+    missing = [index for index, result in enumerate(results) if result is None]
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(CAPTION_BATCH_WORKERS, len(missing))) as executor:
+            for index, result in zip(missing, executor.map(single, [variants[i] for i in missing])):
+                results[index] = result
+
+    return [
+        {"platform": variant['platform'], "tone": variant['tone'], **result}
+        for variant, result in zip(variants, results)
+    ]
+
+
+def build_hashtag_messages(query, platform, count, content_type, popularity_mix):
+    system_prompt = f"""You are a social media hashtag expert specializing in {platform}.
+Generate {count} relevant hashtags for a {content_type} about: {query}.
+
+The popularity mix should be {popularity_mix}, meaning:
+- If 'balanced': Include a mix of popular, moderately popular, and niche hashtags
+- If 'trending': Focus on currently trending and highly popular hashtags
+- If 'niche': Focus on more specific, less competitive hashtags
+
+For each hashtag:
+1. Exclude the # symbol in your response
+2. Make sure each hashtag follows {platform}'s best practices
+3. Ensure hashtags are relevant to the content and keywords
+4. Do not include spaces in hashtags
+
+Return ONLY a JSON array of hashtags, with no additional text or explanations.
+"""
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": f"Keywords: {query}"}
+    ]
+
+
+def parse_generated_hashtags(content, count):
+    """Hashtag names from a JSON-mode completion, tolerating the shapes the model tends to return."""
+    try:
+        hashtag_data = json.loads(content)
+    except json.JSONDecodeError:
+        # If JSON parsing fails, fall back to regex extraction
+        hashtags = re.findall(r'#?([\w\d]+)', content)
+        return [tag for tag in hashtags if tag and ' ' not in tag][:count]
+
+    # Handle different possible formats returned by OpenAI
+    if isinstance(hashtag_data, dict) and 'hashtags' in hashtag_data:
+        hashtags = hashtag_data['hashtags']
+    elif isinstance(hashtag_data, dict) and any(k.startswith('hashtag') for k in hashtag_data.keys()):
+        # If returning a dict with hashtag1, hashtag2, etc. keys
+        hashtags = list(hashtag_data.values())
+    elif isinstance(hashtag_data, list):
+        hashtags = hashtag_data
+    else:
+        # Fallback to parsing text if JSON structure is unexpected
+        hashtags = [tag.strip() for tag in content.split(',')]
+
+    # Clean hashtags - remove # if present and strip spaces
+    cleaned_hashtags = []
+    for tag in hashtags:
+        if isinstance(tag, str):
+            tag = tag.strip()
+            if tag.startswith('#'):
+                tag = tag[1:]
+            # Remove trailing numbers (like '0' at the end)
+            tag = tag.rstrip('0123456789')
+            if tag and ' ' not in tag:  # Skip empty tags or tags with spaces
+                cleaned_hashtags.append(tag)
+
+    return cleaned_hashtags[:count]
+
+
+def generate_hashtags(query, platform, count, content_type, popularity_mix):
+    """
+    Generate hashtags for a topic and make sure each exists as a Hashtag row.
+    Returns (hashtags, completion result).
+    """
+    result = complete(
+        messages=build_hashtag_messages(query, platform, count, content_type, popularity_mix),
+        model=HASHTAG_MODEL,
+        namespace="hashtags",
+        cache_scope=platform,
+        max_tokens=HASHTAG_MAX_TOKENS,
+        response_format={"type": "json_object"}
+    )
+
+    return resolve_hashtags(parse_generated_hashtags(result["content"] or '', count)), result
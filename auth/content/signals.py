@@ -0,0 +1,75 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+import logging
+
+from .autocomplete import mark_changed
+from .hashtags import extract_hashtags
+from . import similarity
+from .models import Caption, Hashtag, HashtagGroup
+from .related import mark_dirty
+from .stats import mark_hashtags_changed, mark_users_dirty
+from .trends import record_post
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Hashtag)
+def hashtag_saved(sender, instance, **kwargs):
+    mark_changed()
+    mark_hashtags_changed([instance.id])
+
+
+@receiver(post_delete, sender=Hashtag)
+def hashtag_deleted(sender, instance, **kwargs):
+    mark_changed(deleted=True)
+
+
+@receiver(post_delete, sender=HashtagGroup)
+def hashtag_group_deleted(sender, instance, **kwargs):
+    mark_users_dirty([instance.user_id])
+
+
+@receiver(post_save, sender=Caption)
+def caption_saved(sender, instance, **kwargs):
+    try:
+        if instance.is_saved:
+            similarity.index('caption', instance.id, instance.user_id, instance.text)
+        else:
+            similarity.remove('caption', instance.id, instance.user_id)
+    except Exception as e:
+        logger.warning(f"Could not update similarity index for caption {instance.id}: {str(e)}")
+
+
+@receiver(post_delete, sender=Caption)
+def caption_deleted(sender, instance, **kwargs):
+    try:
+        similarity.remove('caption', instance.id, instance.user_id)
+    except Exception as e:
+        logger.warning(f"Could not remove caption {instance.id} from similarity index: {str(e)}")
+
+
+@receiver(post_delete, sender='posts.Post')
+def post_deleted(sender, instance, **kwargs):
+    try:
+        similarity.remove('post', instance.id, instance.user_id)
+    except Exception as e:
+        logger.warning(f"Could not remove post {instance.id} from similarity index: {str(e)}")
+
+
+@receiver(post_save, sender='posts.Post')
+def post_saved(sender, instance, **kwargs):
+    try:
+        similarity.index('post', instance.id, instance.user_id, instance.content)
+    except Exception as e:
+        logger.warning(f"Could not update similarity index for post {instance.id}: {str(e)}")
+
+    # Published posts feed trend detection and the related-hashtag co-occurrence counts
+    if instance.status != 'published':
+        return
+    try:
+        record_post(instance)
+    except Exception as e:
+        logger.warning(f"Could not record hashtags of post {instance.id} for trends: {str(e)}")
+    names = extract_hashtags(instance.content)
+    if len(names) > 1:
+        mark_dirty(Hashtag.objects.filter(name__in=names).values_list('id', flat=True))
@@ -0,0 +1,140 @@
+import hashlib
+import logging
+import re
+import time
+import zlib
+
+import numpy as np
+
+from auth.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 64
+# 16 bands of 4 rows: pairs above ~0.6 Jaccard similarity almost always share a band
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+THRESHOLD = 0.6
+
+# Posts are only compared for this long; saved captions stay in the index until removed
+POST_TTL = 90 * 24 * 60 * 60
+
+BAND_KEY = "simidx:{user_id}:{band}:{digest}"
+SIGNATURE_KEY = "simidx:sig:{kind}:{id}"
+
+# Universal hash family h(x) = (a * x + b) mod p over 32-bit shingle hashes; a * x fits in uint64
+_PRIME = np.uint64(4294967311)
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, 2 ** 32 - 1, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 2 ** 32 - 1, size=NUM_PERM, dtype=np.uint64)
+
+_WORD_RE = re.compile(r'\w+')
+
+
+def shingles(text):
+    """Character shingles of the text with case, punctuation and '#' signs removed."""
+    normalized = ' '.join(_WORD_RE.findall((text or '').lower()))
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1)}
+
+
+def signature(text):
+    """MinHash signature of the text, or None when there is nothing to compare."""
+    hashed = np.array([zlib.crc32(shingle.encode()) for shingle in shingles(text)], dtype=np.uint64)
+    if not len(hashed):
+        return None
+    values = (np.outer(hashed, _A) % _PRIME + _B) % _PRIME
+    return values.min(axis=0).astype(np.uint32)
+
+
+def _band_keys(user_id, sig):
+    return [
+        BAND_KEY.format(
+            user_id=user_id,
+            band=band,
+            digest=hashlib.blake2b(sig[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).hexdigest(),
+        )
+        for band in range(BANDS)
+    ]
+
+
+def _member(kind, object_id):
+    return f"{kind}:{object_id}"
+
+
+def remove(kind, object_id, user_id):
+    client = get_redis()
+    signature_key = SIGNATURE_KEY.format(kind=kind, id=object_id)
+    stored = client.get(signature_key)
+    if stored is None:
+        return
+
+    pipe = client.pipeline(transaction=False)
+    for key in _band_keys(user_id, np.frombuffer(stored, dtype=np.uint32)):
+        pipe.zrem(key, _member(kind, object_id))
+    pipe.delete(signature_key)
+    pipe.execute()
+
+
+def index(kind, object_id, user_id, text):
+    """
+    Add or replace one caption or post in the user's index.
+    Each band bucket is a sorted set scored by expiry, so post entries age out
+    while saved captions (scored +inf) stay.
+    """
+    remove(kind, object_id, user_id)
+    sig = signature(text)
+    if sig is None:
+        return
+
+    now = time.time()
+    expires_at = float('inf') if kind == 'caption' else now + POST_TTL
+    member = _member(kind, object_id)
+
+    pipe = get_redis().pipeline(transaction=False)
+    for key in _band_keys(user_id, sig):
+        pipe.zadd(key, {member: expires_at})
+        pipe.zremrangebyscore(key, '-inf', now)
+    if kind == 'caption':
+        pipe.set(SIGNATURE_KEY.format(kind=kind, id=object_id), sig.tobytes())
+    else:
+        pipe.set(SIGNATURE_KEY.format(kind=kind, id=object_id), sig.tobytes(), ex=POST_TTL)
+    pipe.execute()
+
+
+def find_similar(user_id, text, limit=5, exclude=None):
+    """
+    The user's captions and recent posts that look like near-duplicates of text.
+    Returns (kind, id, similarity) tuples, most similar first. Similarity is the
+    MinHash estimate of the Jaccard similarity of the two shingle sets.
+    """
+    sig = signature(text)
+    if sig is None:
+        return []
+
+    client = get_redis()
+    pipe = client.pipeline(transaction=False)
+    for key in _band_keys(user_id, sig):
+        pipe.zrangebyscore(key, time.time(), '+inf')
+    candidates = sorted({member.decode() for members in pipe.execute() for member in members} - {exclude})
+    if not candidates:
+        return []
+
+    stored = client.mget([SIGNATURE_KEY.format(kind=kind, id=object_id)
+                          for kind, object_id in (member.split(':') for member in candidates)])
+    found = [(member, value) for member, value in zip(candidates, stored) if value is not None]
+    if not found:
+        return []
+
+    signatures = np.frombuffer(b''.join(value for _, value in found), dtype=np.uint32).reshape(-1, NUM_PERM)
+    similarities = (signatures == sig).mean(axis=1)
+
+    results = []
+    for (member, _), similarity in zip(found, similarities.tolist()):
+        if similarity >= THRESHOLD:
+            kind, object_id = member.split(':')
+            results.append((kind, int(object_id), round(similarity, 3)))
+    results.sort(key=lambda result: -result[2])
+    return results[:limit]
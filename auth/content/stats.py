@@ -0,0 +1,102 @@
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from auth.redis_client import get_redis
+from .models import HashtagGroup, UserHashtagStat
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_SIZE = 5
+BATCH_SIZE = 200
+
+DIRTY_KEY = "hashtag_stats:dirty_users"
+DIRTY_FLUSH_KEY = "hashtag_stats:refreshing"
+
+
+def mark_users_dirty(user_ids):
+    """Queue users whose hashtag groups changed for the next stats refresh."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    try:
+        get_redis().sadd(DIRTY_KEY, *user_ids)
+    except Exception as e:
+        logger.warning(f"Could not mark hashtag stats for refresh: {str(e)}")
+
+
+def mark_hashtags_changed(hashtag_ids):
+    """Queue every user with one of these hashtags in a group; used after metric updates."""
+    hashtag_ids = list(hashtag_ids)
+    if not hashtag_ids:
+        return
+    mark_users_dirty(
+        HashtagGroup.objects.filter(hashtags__id__in=hashtag_ids)
+        .values_list('user_id', flat=True)
+        .distinct()
+    )
+
+
+def _rank(hashtags):
+    """The category rankings for one user's hashtags, as (category, [hashtag ids])."""
+    by_engagement = sorted(hashtags, key=lambda h: (-h['engagement_rate'], h['id']))
+    return [
+        ('top', by_engagement),
+        ('trending', [h for h in by_engagement if h['is_trending']]),
+        ('growing', sorted(hashtags, key=lambda h: (-h['growth_rate'], h['id']))),
+        ('underperforming', sorted(hashtags, key=lambda h: (h['engagement_rate'], h['id']))),
+    ]
+
+
+def refresh_users(user_ids):
+    """Recompute the stats rows for a batch of users in three queries."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+
+    through = HashtagGroup.hashtags.through
+    hashtags_by_user = {user_id: {} for user_id in user_ids}
+    for row in through.objects.filter(hashtaggroup__user_id__in=user_ids).values(
+        'hashtaggroup__user_id', 'hashtag_id',
+        'hashtag__engagement_rate', 'hashtag__growth_rate', 'hashtag__is_trending',
+    ):
+        hashtags_by_user[row['hashtaggroup__user_id']][row['hashtag_id']] = {
+            'id': row['hashtag_id'],
+            'engagement_rate': row['hashtag__engagement_rate'],
+            'growth_rate': row['hashtag__growth_rate'],
+            'is_trending': row['hashtag__is_trending'],
+        }
+
+    now = timezone.now()
+    rows = [
+        UserHashtagStat(
+            user_id=user_id, category=category, rank=rank, hashtag_id=hashtag['id'], updated_at=now
+        )
+        for user_id, hashtags in hashtags_by_user.items()
+        for category, ranked in _rank(list(hashtags.values()))
+        for rank, hashtag in enumerate(ranked[:CATEGORY_SIZE])
+    ]
+
+    with transaction.atomic():
+        UserHashtagStat.objects.filter(user_id__in=user_ids).delete()
+        UserHashtagStat.objects.bulk_create(rows)
+    return len(user_ids)
+
+
+def refresh_dirty():
+    """Refresh every user queued since the last run, in batches."""
+    client = get_redis()
+    if not client.exists(DIRTY_FLUSH_KEY):
+        try:
+            client.rename(DIRTY_KEY, DIRTY_FLUSH_KEY)
+        except Exception:
+            # Nothing changed since the last refresh
+            return 0
+
+    user_ids = sorted(int(member) for member in client.smembers(DIRTY_FLUSH_KEY))
+    for start in range(0, len(user_ids), BATCH_SIZE):
+        refresh_users(user_ids[start:start + BATCH_SIZE])
+
+    client.delete(DIRTY_FLUSH_KEY)
+    return len(user_ids)
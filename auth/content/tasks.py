@@ -0,0 +1,35 @@
+from celery import shared_task
+from django.core.cache import cache
+import logging
+
+from . import metrics, related, stats, trends
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def refresh_related_hashtags_task(full=False):
+    rows = related.refresh(full=full)
+    if rows:
+        logger.info(f"Wrote {rows} related hashtag rows ({'full' if full else 'incremental'} refresh).")
+    return rows
+
+
+@shared_task
+def refresh_hashtag_metrics_task(limit=None):
+    try:
+        refreshed = metrics.refresh_hashtag_metrics(limit=limit)
+    finally:
+        cache.delete(metrics.QUEUED_KEY)
+    logger.info(f"Refreshed metrics for {refreshed} hashtags.")
+    return refreshed
+
+
+@shared_task
+def refresh_hashtag_stats_task():
+    return stats.refresh_dirty()
+
+
+@shared_task
+def refresh_trending_hashtags_task():
+    return trends.refresh_trending()
@@ -0,0 +1,176 @@
+import hashlib
+import logging
+import time
+
+from django.utils import timezone
+
+from auth.redis_client import get_redis
+from .autocomplete import mark_changed
+from .hashtags import extract_hashtags, resolve_hashtags
+from .models import Hashtag
+from .stats import mark_hashtags_changed
+
+logger = logging.getLogger(__name__)
+
+# Count-min sketch dimensions: estimates overcount by at most ~e/WIDTH of a bucket's
+# total with probability 1 - e^-DEPTH, whatever the number of distinct tags
+SKETCH_DEPTH = 4
+SKETCH_WIDTH = 2048
+# Heavy hitters tracked per bucket by space-saving
+TOP_K = 200
+
+BUCKET_SECONDS = 60 * 60
+WINDOW_BUCKETS = 24
+# Buckets are kept for the current window and the one before it, which growth is measured against
+BUCKET_TTL = (2 * WINDOW_BUCKETS + 1) * BUCKET_SECONDS
+
+TRENDING_SIZE = 30
+MIN_TRENDING_COUNT = 3
+
+SKETCH_KEY = "trends:cms:{bucket}"
+TOP_KEY = "trends:top:{bucket}"
+SEEN_KEY = "trends:seen:{post_id}"
+
+# Per tag, ARGV holds the name followed by its SKETCH_DEPTH sketch cells
+RECORD_SCRIPT = """
+local k = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+local depth = tonumber(ARGV[3])
+local i = 4
+while i <= #ARGV do
+    local tag = ARGV[i]
+    for d = 1, depth do
+        redis.call('hincrby', KEYS[1], ARGV[i + d], 1)
+    end
+    i = i + depth + 1
+
+    if redis.call('zscore', KEYS[2], tag) then
+        redis.call('zincrby', KEYS[2], 1, tag)
+    elseif redis.call('zcard', KEYS[2]) < k then
+        redis.call('zadd', KEYS[2], 1, tag)
+    else
+        -- Space-saving: the new tag replaces the smallest counter and inherits its count
+        local smallest = redis.call('zrange', KEYS[2], 0, 0, 'WITHSCORES')
+        redis.call('zrem', KEYS[2], smallest[1])
+        redis.call('zadd', KEYS[2], tonumber(smallest[2]) + 1, tag)
+    end
+end
+redis.call('expire', KEYS[1], ttl)
+redis.call('expire', KEYS[2], ttl)
+return 1
+"""
+
+
+def current_bucket():
+    return int(time.time()) // BUCKET_SECONDS
+
+
+def sketch_cells(tag):
+    """The SKETCH_DEPTH cells, one per row, that a tag is counted in."""
+    digest = hashlib.blake2b(tag.encode(), digest_size=4 * SKETCH_DEPTH).digest()
+    return [
+        f"{row}:{int.from_bytes(digest[4 * row:4 * row + 4], 'big') % SKETCH_WIDTH}"
+        for row in range(SKETCH_DEPTH)
+    ]
+
+
+def record_post(post):
+    """Count the hashtags of a newly published post; each post is counted once."""
+    tags = extract_hashtags(post.content)
+    if not tags:
+        return
+
+    client = get_redis()
+    if not client.set(SEEN_KEY.format(post_id=post.id), 1, nx=True, ex=BUCKET_TTL):
+        return
+
+    bucket = current_bucket()
+    args = [TOP_K, BUCKET_TTL, SKETCH_DEPTH]
+    for tag in tags:
+        args.append(tag)
+        args.extend(sketch_cells(tag))
+    client.eval(RECORD_SCRIPT, 2, SKETCH_KEY.format(bucket=bucket), TOP_KEY.format(bucket=bucket), *args)
+
+
+def window_counts(tags, buckets):
+    """Count-min estimates for each tag summed over the given buckets, in one round trip."""
+    cells = {tag: sketch_cells(tag) for tag in tags}
+    fields = [cell for tag in tags for cell in cells[tag]]
+
+    pipe = get_redis().pipeline(transaction=False)
+    for bucket in buckets:
+        pipe.hmget(SKETCH_KEY.format(bucket=bucket), fields)
+
+    totals = dict.fromkeys(tags, 0)
+    for values in pipe.execute():
+        for index, tag in enumerate(tags):
+            row_values = values[index * SKETCH_DEPTH:(index + 1) * SKETCH_DEPTH]
+            totals[tag] += min(int(value or 0) for value in row_values)
+    return totals
+
+
+def detect_trends():
+    """
+    Current-window counts and growth rates for the heavy hitters of the window.
+    Returns a list of (tag, count, growth_rate) sorted by count.
+    """
+    now = current_bucket()
+    current = list(range(now - WINDOW_BUCKETS + 1, now + 1))
+    previous = list(range(now - 2 * WINDOW_BUCKETS + 1, now - WINDOW_BUCKETS + 1))
+
+    pipe = get_redis().pipeline(transaction=False)
+    for bucket in current:
+        pipe.zrange(TOP_KEY.format(bucket=bucket), 0, -1)
+    candidates = sorted({tag.decode() for members in pipe.execute() for tag in members})
+    if not candidates:
+        return []
+
+    current_counts = window_counts(candidates, current)
+    previous_counts = window_counts(candidates, previous)
+
+    trends = []
+    for tag in candidates:
+        count = current_counts[tag]
+        before = previous_counts[tag]
+        growth_rate = (count - before) / max(before, 1) * 100
+        trends.append((tag, count, growth_rate))
+    trends.sort(key=lambda trend: (-trend[1], -trend[2], trend[0]))
+    return trends
+
+
+def refresh_trending():
+    """
+    Write detected growth rates to Hashtag and flag the top tags as trending.
+    Returns the number of trending hashtags.
+    """
+    trends = detect_trends()
+    if not trends:
+        return 0
+
+    hashtags = {hashtag.name: hashtag for hashtag in resolve_hashtags([tag for tag, _, _ in trends])}
+    trending = {tag for tag, count, _ in trends[:TRENDING_SIZE] if count >= MIN_TRENDING_COUNT}
+
+    now = timezone.now()
+    updated = []
+    for tag, count, growth_rate in trends:
+        hashtag = hashtags.get(tag)
+        if hashtag is None:
+            continue
+        hashtag.growth_rate = round(growth_rate, 2)
+        hashtag.is_trending = tag in trending
+        hashtag.last_updated = now
+        updated.append(hashtag)
+    Hashtag.objects.bulk_update(updated, ['growth_rate', 'is_trending', 'last_updated'])
+
+    # Tags that dropped out of the window stop trending
+    dropped = list(
+        Hashtag.objects.filter(is_trending=True)
+        .exclude(id__in=[hashtag.id for hashtag in updated])
+        .values_list('id', flat=True)
+    )
+    if dropped:
+        Hashtag.objects.filter(id__in=dropped).update(is_trending=False, growth_rate=0.0, last_updated=now)
+
+    mark_changed()
+    mark_hashtags_changed([hashtag.id for hashtag in updated] + dropped)
+    return len(trending)
@@ -4,12 +4,16 @@ from . import views
 urlpatterns = [
     # Caption endpoints
     path('generate-caption/', views.GenerateCaptionView.as_view(), name='generate-caption'),
+    path('generate-caption/batch/', views.GenerateCaptionBatchView.as_view(), name='generate-caption-batch'),
+    path('generate-caption/stream/', views.GenerateCaptionStreamView.as_view(), name='generate-caption-stream'),
     path('saved-captions/', views.CaptionListView.as_view(), name='saved-captions'),
     path('saved-captions/<int:pk>/', views.CaptionDetailView.as_view(), name='caption-detail'),
+    path('saved-captions/similar/', views.SimilarCaptionsView.as_view(), name='similar-captions'),
     
     # Hashtag endpoints
     path('generate-hashtags/', views.GenerateHashtagsView.as_view(), name='generate-hashtags'),
     path('hashtags/trending/', views.TrendingHashtagsView.as_view(), name='trending-hashtags'),
+    path('hashtags/autocomplete/', views.HashtagAutocompleteView.as_view(), name='hashtag-autocomplete'),
     path('hashtags/related/', views.RelatedHashtagsView.as_view(), name='related-hashtags'),
     path('hashtag-groups/', views.HashtagGroupListView.as_view(), name='hashtag-groups'),
     path('hashtag-groups/<int:pk>/', views.HashtagGroupDetailView.as_view(), name='hashtag-group-detail'),
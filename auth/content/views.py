@@ -2,27 +2,50 @@ from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.conf import settings
-from .models import Caption, Hashtag, HashtagGroup, Media
+from posts.models import Post
+from .models import Caption, Hashtag, HashtagGroup, HashtagPlatformStats, Media, UserHashtagStat
 from .serializers import (
     CaptionSerializer, 
     HashtagSerializer, 
     HashtagGroupSerializer, 
     MediaSerializer,
     CaptionGenerateSerializer,
-    HashtagGenerateSerializer
+    CaptionBatchGenerateSerializer,
+    HashtagGenerateSerializer,
+    SimilarCaptionQuerySerializer
+)
+from ai_services import metering
+from ai_services.completions import complete, stream
+from ai_services.permissions import WithinAIQuota
+from ai_services.sse import EventStreamRenderer, event_stream_response, format_event
+from rest_framework.renderers import JSONRenderer
+from .autocomplete import MAX_LIMIT as AUTOCOMPLETE_MAX_LIMIT, suggest
+from .hashtags import add_hashtags_to_group, normalize_hashtag, resolve_hashtags
+from .metrics import queue_refresh
+from .pagination import CaptionCursorPagination
+from .related import related_hashtags
+from .similarity import find_similar
+from .stats import refresh_users as refresh_user_stats
+from .trends import refresh_trending
+from .services import (
+    CAPTION_MAX_TOKENS,
+    CAPTION_MODEL,
+    build_caption_messages,
+    extract_caption_hashtags,
+    friendly_openai_error,
+    generate_caption,
+    generate_caption_batch,
+    generate_hashtags,
 )
-from openai import OpenAI
-import os
 import logging
-from django.db import models
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db.models import F, OuterRef, Subquery
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY', settings.OPENAI_API_KEY))
 logger = logging.getLogger(__name__)
 
 
 class GenerateCaptionView(APIView):
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, WithinAIQuota]
 
     def post(self, request, *args, **kwargs):
         serializer = CaptionGenerateSerializer(data=request.data)
@@ -36,96 +59,51 @@ class GenerateCaptionView(APIView):
 
             try:
                 # Check if OpenAI API key is configured
-                api_key = os.environ.get('OPENAI_API_KEY') or getattr(settings, 'OPENAI_API_KEY', None)
-                if not api_key:
+                if settings.AI_BACKEND == 'openai' and not settings.OPENAI_API_KEY:
                     logger.error("OpenAI API key is not configured")
                     return Response(
                         {"error": "OpenAI API key is not configured. Please set the OPENAI_API_KEY in settings or environment variables."},
                         status=status.HTTP_500_INTERNAL_SERVER_ERROR
                     )
                 
-                # Initialize OpenAI client with the API key to ensure we're using the latest config
-                openai_client = OpenAI(api_key=api_key)
-                
-                # Create system message based on parameters
-                system_content = f"You are a professional social media copywriter. Create a compelling {platform} caption with a {tone} tone."
-                if include_hashtags:
-                    system_content += f" Include {hashtag_count} relevant hashtags at the end."
-
                 # If media_id is provided, fetch the image details
                 media_url = None
                 if media_id:
                     try:
                         media = Media.objects.get(id=media_id, user=request.user)
                         media_url = request.build_absolute_uri(media.file.url)
-                        # Add instruction to analyze the image
-                        if prompt:
-                            user_content = f"Write a caption about: {prompt}\n\nThis caption will accompany the image at: {media_url}"
-                        else:
-                            user_content = f"Write a caption for this image: {media_url}"
                     except Media.DoesNotExist:
                         return Response(
                             {"error": "Media not found or does not belong to this user."},
                             status=status.HTTP_404_NOT_FOUND
                         )
-                else:
-                    if not prompt:
-                        return Response(
-                            {"error": "Either a prompt or an image is required for caption generation."},
-                            status=status.HTTP_400_BAD_REQUEST
-                        )
-                    user_content = f"Write a caption about: {prompt}"
+                elif not prompt:
+                    return Response(
+                        {"error": "Either a prompt or an image is required for caption generation."},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
 
                 try:
-                    response = openai_client.chat.completions.create(model="gpt-4o",
-                    messages=[
-                        {"role": "system", "content": system_content},
-                        {"role": "user", "content": user_content}
-                    ],
-                    max_tokens=500)
+                    result = generate_caption(
+                        prompt, platform, tone, include_hashtags, hashtag_count, media_url
+                    )
                 except Exception as openai_error:
                     logger.error(f"OpenAI API error: {str(openai_error)}")
-                    error_message = str(openai_error)
-                    
-                    # Provide more user-friendly error messages for common issues
-                    if "api_key" in error_message.lower():
-                        error_message = "Invalid OpenAI API key. Please check your API configuration."
-                    elif "rate limit" in error_message.lower():
-                        error_message = "OpenAI API rate limit exceeded. Please try again later."
-                    elif "insufficient_quota" in error_message.lower():
-                        error_message = "OpenAI API quota exceeded. Please check your usage limits."
-                    
                     return Response(
-                        {"error": error_message},
+                        {"error": friendly_openai_error(openai_error)},
                         status=status.HTTP_503_SERVICE_UNAVAILABLE
                     )
 
-                if not response or not hasattr(response, 'choices') or not response.choices:
+                if not result["content"]:
                     logger.error("OpenAI API returned an empty or invalid response")
                     return Response(
                         {"error": "Failed to generate caption due to an invalid API response."},
                         status=status.HTTP_500_INTERNAL_SERVER_ERROR
                     )
 
-                caption_text = response.choices[0].message.content
-
-                # Extract hashtags from the caption if they were included
-                hashtags = []
-                if include_hashtags:
-                    # Simple regex to extract hashtags
-                    import re
-                    hashtags = re.findall(r'#(\w+)', caption_text)
-                    
-                    # If no hashtags were found with #, try looking for a list of hashtags
-                    if not hashtags and "hashtag" in caption_text.lower():
-                        # Try to find a list of hashtags that might not have the # symbol
-                        potential_tags = re.findall(r'(?:hashtags?:?\s*|tags?:?\s*)([\w\s,]+)(?:\n|$)', caption_text.lower())
-                        if potential_tags:
-                            # Split the found text by commas or spaces and clean up
-                            for tag_text in potential_tags:
-                                for tag in re.findall(r'\b(\w+)\b', tag_text):
-                                    if tag and tag not in ['hashtags', 'tags', 'and', 'or', 'the', 'for']:
-                                        hashtags.append(tag)
+                metering.record(request.user.id, "caption", result["tokens_used"])
+                caption_text = result["content"]
+                hashtags = result["hashtags"]
 
                 # Create a caption object but don't save it yet
                 caption = Caption(
@@ -142,7 +120,8 @@ class GenerateCaptionView(APIView):
                 # Return the caption with hashtags
                 return Response({
                     "caption": caption_data,
-                    "tokens_used": response.usage.total_tokens
+                    "tokens_used": result["tokens_used"],
+                    "cached": result["cached"]
                 })
 
             except Exception as e:
@@ -157,12 +136,176 @@ class GenerateCaptionView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class GenerateCaptionBatchView(APIView):
+    """Caption variants for several platforms and tones from a single request."""
+    permission_classes = [permissions.IsAuthenticated, WithinAIQuota]
+
+    def post(self, request, *args, **kwargs):
+        serializer = CaptionBatchGenerateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        prompt = serializer.validated_data['prompt']
+        variants = serializer.validated_data['variants']
+        media_id = serializer.validated_data.get('media_id')
+
+        if settings.AI_BACKEND == 'openai' and not settings.OPENAI_API_KEY:
+            logger.error("OpenAI API key is not configured")
+            return Response(
+                {"error": "OpenAI API key is not configured. Please set the OPENAI_API_KEY in settings or environment variables."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        media_url = None
+        if media_id:
+            try:
+                media = Media.objects.get(id=media_id, user=request.user)
+                media_url = request.build_absolute_uri(media.file.url)
+            except Media.DoesNotExist:
+                return Response(
+                    {"error": "Media not found or does not belong to this user."},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+        elif not prompt:
+            return Response(
+                {"error": "Either a prompt or an image is required for caption generation."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            results = generate_caption_batch(
+                prompt,
+                variants,
+                serializer.validated_data['include_hashtags'],
+                serializer.validated_data['hashtag_count'],
+                media_url
+            )
+        except Exception as openai_error:
+            logger.error(f"OpenAI API error: {str(openai_error)}")
+            return Response(
+                {"error": friendly_openai_error(openai_error)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        metering.record(request.user.id, "caption_batch", sum(result["tokens_used"] for result in results))
+
+        captions = []
+        for result in results:
+            caption = Caption(
+                user=request.user,
+                text=result["content"] or '',
+                platform=result["platform"],
+                is_saved=False
+            )
+            caption_data = CaptionSerializer(caption).data
+            caption_data['hashtags'] = result["hashtags"]
+            captions.append({
+                "caption": caption_data,
+                "tone": result["tone"],
+                "tokens_used": result["tokens_used"],
+                "cached": result["cached"]
+            })
+
+        return Response({
+            "captions": captions,
+            "tokens_used": sum(result["tokens_used"] for result in results)
+        })
+
+
+class GenerateCaptionStreamView(APIView):
+    permission_classes = [permissions.IsAuthenticated, WithinAIQuota]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def post(self, request, *args, **kwargs):
+        """
+        Stream a caption over Server-Sent Events.
+        Emits `token` events as text arrives and a final `done` event with the saved caption.
+        """
+        serializer = CaptionGenerateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        media_url = None
+        if data.get('media_id'):
+            try:
+                media = Media.objects.get(id=data['media_id'], user=request.user)
+                media_url = request.build_absolute_uri(media.file.url)
+            except Media.DoesNotExist:
+                return Response(
+                    {"error": "Media not found or does not belong to this user."},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
+        messages = build_caption_messages(
+            data['prompt'], data['platform'], data['tone'],
+            data['include_hashtags'], data.get('hashtag_count', 5), media_url
+        )
+        user = request.user
+
+        def events():
+            try:
+                for kind, payload in stream(
+                    messages=messages,
+                    model=CAPTION_MODEL,
+                    namespace="caption",
+                    cache_scope=data['platform'],
+                    max_tokens=CAPTION_MAX_TOKENS
+                ):
+                    if kind == "delta":
+                        yield format_event("token", {"content": payload})
+                        continue
+
+                    metering.record(user.id, "caption", payload["tokens_used"])
+                    caption = Caption.objects.create(
+                        user=user,
+                        text=payload["content"],
+                        platform=data['platform'],
+                        is_saved=False
+                    )
+                    caption_data = CaptionSerializer(caption).data
+                    caption_data['hashtags'] = (
+                        extract_caption_hashtags(caption.text) if data['include_hashtags'] else []
+                    )
+                    yield format_event("done", {
+                        "caption": caption_data,
+                        "tokens_used": payload["tokens_used"],
+                        "cached": payload["cached"]
+                    })
+            except Exception as e:
+                logger.error(f"Error streaming caption: {str(e)}")
+                yield format_event("error", {"error": friendly_openai_error(e)})
+
+        return event_stream_response(events())
+
+
 class CaptionListView(generics.ListCreateAPIView):
+    """
+    The user's saved captions, cursor-paginated.
+    `?q=` runs a ranked full-text search over the caption text and `?platform=` filters by platform.
+    """
     serializer_class = CaptionSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CaptionCursorPagination
+
+    @property
+    def search_query(self):
+        return self.request.query_params.get('q', '').strip()
 
     def get_queryset(self):
-        return Caption.objects.filter(user=self.request.user, is_saved=True).order_by('-created_at')
+        queryset = Caption.objects.filter(user=self.request.user, is_saved=True).defer('search_vector')
+
+        platform = self.request.query_params.get('platform')
+        if platform:
+            queryset = queryset.filter(platform=platform)
+
+        if self.search_query:
+            query = SearchQuery(self.search_query, search_type='websearch', config='english')
+            queryset = queryset.filter(search_vector=query).annotate(
+                rank=SearchRank(F('search_vector'), query)
+            )
+
+        return queryset
 
 
 class CaptionDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -173,9 +316,73 @@ class CaptionDetailView(generics.RetrieveUpdateDestroyAPIView):
         return Caption.objects.filter(user=self.request.user)
 
 
-class GenerateHashtagsView(APIView):
+class SimilarCaptionsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    def post(self, request, *args, **kwargs):
+        """
+        Find the user's saved captions and recent posts that are near-duplicates of `text`,
+        so the composer can warn before posting the same thing twice or offer to reuse it.
+        """
+        serializer = SimilarCaptionQuerySerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        exclude = f"caption:{data['exclude_caption_id']}" if data.get('exclude_caption_id') else None
+
+        try:
+            matches = find_similar(request.user.id, data['text'], data['limit'], exclude=exclude)
+        except Exception as e:
+            logger.error(f"Error finding similar captions: {str(e)}")
+            return Response(
+                {"error": "Error finding similar captions. Please try again."},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        caption_ids = [object_id for kind, object_id, _ in matches if kind == 'caption']
+        post_ids = [object_id for kind, object_id, _ in matches if kind == 'post']
+        captions = {
+            caption.id: caption
+            for caption in Caption.objects.filter(id__in=caption_ids, user=request.user)
+        } if caption_ids else {}
+        posts = {
+            post.id: post
+            for post in Post.objects.filter(id__in=post_ids, user=request.user)
+        } if post_ids else {}
+
+        duplicates = []
+        for kind, object_id, similarity in matches:
+            if kind == 'caption' and object_id in captions:
+                caption = captions[object_id]
+                duplicates.append({
+                    "type": "caption",
+                    "id": caption.id,
+                    "text": caption.text,
+                    "platform": caption.platform,
+                    "similarity": similarity,
+                    "created_at": caption.created_at,
+                })
+            elif kind == 'post' and object_id in posts:
+                post = posts[object_id]
+                duplicates.append({
+                    "type": "post",
+                    "id": post.id,
+                    "text": post.content,
+                    "status": post.status,
+                    "similarity": similarity,
+                    "created_at": post.created_at,
+                })
+
+        return Response({
+            "is_duplicate": bool(duplicates),
+            "duplicates": duplicates
+        })
+
+
+class GenerateHashtagsView(APIView):
+    permission_classes = [permissions.IsAuthenticated, WithinAIQuota]
+
     def post(self, request, *args, **kwargs):
         serializer = HashtagGenerateSerializer(data=request.data)
         if serializer.is_valid():
@@ -186,89 +393,16 @@ class GenerateHashtagsView(APIView):
             popularity_mix = serializer.validated_data['popularity_mix']
 
             try:
-                # Construct a detailed prompt based on the parameters
-                system_prompt = f"""You are a social media hashtag expert specializing in {platform}.
-Generate {count} relevant hashtags for a {content_type} about: {query}.
-
-The popularity mix should be {popularity_mix}, meaning:
-- If 'balanced': Include a mix of popular, moderately popular, and niche hashtags
-- If 'trending': Focus on currently trending and highly popular hashtags
-- If 'niche': Focus on more specific, less competitive hashtags
-
-For each hashtag:
-1. Exclude the # symbol in your response
-2. Make sure each hashtag follows {platform}'s best practices
-3. Ensure hashtags are relevant to the content and keywords
-4. Do not include spaces in hashtags
-
-Return ONLY a JSON array of hashtags, with no additional text or explanations.
-"""
-
-                response = client.chat.completions.create(model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Keywords: {query}"}
-                ],
-                max_tokens=500,
-                response_format={"type": "json_object"})
-
-                # Extract JSON from response
-                import json
-                try:
-                    content = response.choices[0].message.content
-                    hashtag_data = json.loads(content)
-
-                    # Handle different possible formats returned by OpenAI
-                    if isinstance(hashtag_data, dict) and 'hashtags' in hashtag_data:
-                        hashtags = hashtag_data['hashtags']
-                    elif isinstance(hashtag_data, dict) and any(k.startswith('hashtag') for k in hashtag_data.keys()):
-                        # If returning a dict with hashtag1, hashtag2, etc. keys
-                        hashtags = list(hashtag_data.values())
-                    elif isinstance(hashtag_data, list):
-                        hashtags = hashtag_data
-                    else:
-                        # Fallback to parsing text if JSON structure is unexpected
-                        hashtags = [tag.strip() for tag in content.split(',')]
-
-                    # Clean hashtags - remove # if present and strip spaces
-                    cleaned_hashtags = []
-                    for tag in hashtags:
-                        if isinstance(tag, str):
-                            tag = tag.strip()
-                            if tag.startswith('#'):
-                                tag = tag[1:]
-                            # Remove trailing numbers (like '0' at the end)
-                            tag = tag.rstrip('0123456789')
-                            if tag and ' ' not in tag:  # Skip empty tags or tags with spaces
-                                cleaned_hashtags.append(tag)
-
-                    # Create or fetch hashtag objects
-                    hashtag_objects = []
-                    for tag_name in cleaned_hashtags[:count]:  # Ensure we don't exceed requested count
-                        hashtag, created = Hashtag.objects.get_or_create(name=tag_name)
-                        hashtag_objects.append(hashtag)
-
-                    return Response({
-                        "hashtags": HashtagSerializer(hashtag_objects, many=True).data,
-                        "tokens_used": response.usage.total_tokens
-                    })
+                hashtag_objects, result = generate_hashtags(
+                    query, platform, count, content_type, popularity_mix
+                )
+                metering.record(request.user.id, "hashtags", result["tokens_used"])
 
-                except json.JSONDecodeError:
-                    # If JSON parsing fails, fall back to regex extraction
-                    import re
-                    hashtags = re.findall(r'#?([\w\d]+)', response.choices[0].message.content)
-                    hashtags = [tag for tag in hashtags if tag and ' ' not in tag][:count]
-
-                    # Create or fetch hashtag objects
-                    hashtag_objects = []
-                    for tag_name in hashtags:
-                        hashtag, created = Hashtag.objects.get_or_create(name=tag_name)
-                        hashtag_objects.append(hashtag)
-
-                    return Response({
-                        "hashtags": HashtagSerializer(hashtag_objects, many=True).data,
-                        "tokens_used": response.usage.total_tokens
-                    })
+                return Response({
+                    "hashtags": HashtagSerializer(hashtag_objects, many=True).data,
+                    "tokens_used": result["tokens_used"],
+                    "cached": result["cached"]
+                })
 
             except Exception as e:
                 logger.error(f"Error generating hashtags: {str(e)}")
@@ -286,7 +420,32 @@ class TrendingHashtagsView(generics.ListAPIView):
 
     def get_queryset(self):
         platform = self.request.query_params.get('platform', 'instagram')
-        return Hashtag.objects.filter(is_trending=True).order_by('-post_count')[:30]
+        # Ranked by engagement measured on the requested platform, then overall
+        platform_engagement = HashtagPlatformStats.objects.filter(
+            hashtag=OuterRef('pk'), platform=platform
+        ).values('engagement_rate')[:1]
+        return (
+            Hashtag.objects.filter(is_trending=True)
+            .annotate(platform_engagement=Subquery(platform_engagement))
+            .order_by(F('platform_engagement').desc(nulls_last=True), '-engagement_rate', '-growth_rate')[:30]
+        )
+
+
+class HashtagAutocompleteView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs):
+        """Hashtags starting with `q`, ranked by post count and engagement rate."""
+        prefix = normalize_hashtag(request.query_params.get('q', ''))
+        if not prefix:
+            return Response([])
+
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 10)), AUTOCOMPLETE_MAX_LIMIT))
+        except ValueError:
+            limit = 10
+
+        return Response(suggest(prefix, limit))
 
 
 class RelatedHashtagsView(APIView):
@@ -302,16 +461,29 @@ class RelatedHashtagsView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # Served from our own co-occurrence data when we have seen the tag before
+        related = related_hashtags(normalize_hashtag(hashtag))
+        if related:
+            return Response(HashtagSerializer(related, many=True).data)
+
+        if not metering.has_quota(request.user.id):
+            return Response({"error": WithinAIQuota.message}, status=status.HTTP_403_FORBIDDEN)
+
         try:
-            # Find related hashtags using OpenAI
-            response = client.chat.completions.create(model="gpt-4o",
-            messages=[
-                {"role": "system", "content": f"You are a social media hashtag expert. Given a hashtag, provide 10 related and popular hashtags for {platform} without descriptions. Only return the hashtags, one per line."},
-                {"role": "user", "content": f"Generate related hashtags for: #{hashtag}"}
-            ],
-            max_tokens=200)
+            # Unseen tag: find related hashtags using OpenAI
+            result = complete(
+                messages=[
+                    {"role": "system", "content": f"You are a social media hashtag expert. Given a hashtag, provide 10 related and popular hashtags for {platform} without descriptions. Only return the hashtags, one per line."},
+                    {"role": "user", "content": f"Generate related hashtags for: #{hashtag}"}
+                ],
+                model="gpt-4o",
+                namespace="related_hashtags",
+                cache_scope=platform,
+                max_tokens=200
+            )
 
-            hashtag_text = response.choices[0].message.content
+            metering.record(request.user.id, "related_hashtags", result["tokens_used"])
+            hashtag_text = result["content"]
 
             # Extract hashtags from the text
             import re
@@ -319,10 +491,7 @@ class RelatedHashtagsView(APIView):
             hashtags = [tag.strip('#') for tag in hashtags if tag.strip()][:10]
 
             # Create or fetch hashtag objects
-            hashtag_objects = []
-            for tag_name in hashtags:
-                hashtag, created = Hashtag.objects.get_or_create(name=tag_name)
-                hashtag_objects.append(hashtag)
+            hashtag_objects = resolve_hashtags(hashtags)
 
             return Response(HashtagSerializer(hashtag_objects, many=True).data)
 
@@ -415,20 +584,9 @@ class SaveHashtagGroupView(APIView):
             )
 
             # Add hashtags to group
-            if hashtag_ids:
-                hashtags = Hashtag.objects.filter(id__in=hashtag_ids)
-                hashtag_group.hashtags.add(*hashtags)
-
-            if hashtag_names:
-                for name in hashtag_names:
-                    if isinstance(name, str) and name.strip():
-                        # Clean hashtag name (remove # if present)
-                        clean_name = name.strip()
-                        if clean_name.startswith('#'):
-                            clean_name = clean_name[1:]
-
-                        hashtag, created = Hashtag.objects.get_or_create(name=clean_name)
-                        hashtag_group.hashtags.add(hashtag)
+            hashtags = list(Hashtag.objects.filter(id__in=hashtag_ids)) if hashtag_ids else []
+            hashtags += resolve_hashtags(hashtag_names)
+            add_hashtags_to_group(hashtag_group, hashtags)
 
             # Return the created group
             return Response(
@@ -452,63 +610,36 @@ class HashtagPerformanceView(APIView):
         Get hashtag performance metrics by category.
         """
         try:
-            # Get all hashtags used by this user through their hashtag groups
-            user_hashtag_groups = HashtagGroup.objects.filter(user=request.user)
-            user_hashtags = Hashtag.objects.filter(groups__in=user_hashtag_groups).distinct()
+            # Precomputed per-user rankings (content/stats.py), read with one indexed query
+            rows = list(
+                UserHashtagStat.objects.filter(user=request.user)
+                .select_related('hashtag')
+                .order_by('category', 'rank')
+            )
+            if not rows:
+                # First visit, or the user has no hashtags yet
+                refresh_user_stats([request.user.id])
+                rows = list(
+                    UserHashtagStat.objects.filter(user=request.user)
+                    .select_related('hashtag')
+                    .order_by('category', 'rank')
+                )
 
-            if not user_hashtags.exists():
-                # If no hashtags, return placeholder data
-                return Response({
-                    "categories": [],
-                    "metrics": []
-                })
+            by_category = {}
+            for row in rows:
+                by_category.setdefault(row.category, []).append(row.hashtag)
 
-            # For demonstration, let's categorize hashtags based on engagement rate
-            # In a real system, you might have more sophisticated categorization
             categories = []
             metrics = []
-
-            # Simulate hashtag categories - in a real app, these might come from ML classification
-            # or actual social media platform engagement data
-
-            # Get top hashtags by engagement
-            top_hashtags = user_hashtags.order_by('-engagement_rate')[:5]
-            if top_hashtags:
-                categories.append("Top Performing")
-                metrics.append({
-                    "category": "Top Performing",
-                    "average_engagement": round(top_hashtags.aggregate(models.Avg('engagement_rate'))['engagement_rate__avg'] or 0, 2),
-                    "hashtags": HashtagSerializer(top_hashtags, many=True).data
-                })
-
-            # Get trending hashtags
-            trending_hashtags = user_hashtags.filter(is_trending=True)[:5]
-            if trending_hashtags:
-                categories.append("Trending")
+            for category, label in UserHashtagStat.CATEGORY_CHOICES:
+                hashtags = by_category.get(category)
+                if not hashtags:
+                    continue
+                categories.append(label)
                 metrics.append({
-                    "category": "Trending",
-                    "average_engagement": round(trending_hashtags.aggregate(models.Avg('engagement_rate'))['engagement_rate__avg'] or 0, 2),
-                    "hashtags": HashtagSerializer(trending_hashtags, many=True).data
-                })
-
-            # Get growing hashtags (highest growth rate)
-            growing_hashtags = user_hashtags.order_by('-growth_rate')[:5]
-            if growing_hashtags:
-                categories.append("Growing")
-                metrics.append({
-                    "category": "Growing",
-                    "average_engagement": round(growing_hashtags.aggregate(models.Avg('engagement_rate'))['engagement_rate__avg'] or 0, 2),
-                    "hashtags": HashtagSerializer(growing_hashtags, many=True).data
-                })
-
-            # Get low performing hashtags
-            low_hashtags = user_hashtags.order_by('engagement_rate')[:5]
-            if low_hashtags:
-                categories.append("Underperforming")
-                metrics.append({
-                    "category": "Underperforming",
-                    "average_engagement": round(low_hashtags.aggregate(models.Avg('engagement_rate'))['engagement_rate__avg'] or 0, 2),
-                    "hashtags": HashtagSerializer(low_hashtags, many=True).data
+                    "category": label,
+                    "average_engagement": round(sum(h.engagement_rate for h in hashtags) / len(hashtags), 2),
+                    "hashtags": HashtagSerializer(hashtags, many=True).data
                 })
 
             return Response({
@@ -529,102 +660,26 @@ class RefreshHashtagDataView(APIView):
 
     def post(self, request, *args, **kwargs):
         """
-        Refresh hashtag data by fetching the latest information.
-        This simulates getting updated metrics from social media platforms.
-        In a production app, this would connect to actual platform APIs.
+        Refresh trending hashtags from hashtag activity in posts published through Linkly
+        (see content/trends.py) and queue a background refresh of the other hashtag metrics.
         """
         platform = request.data.get('platform', 'instagram')
 
         try:
-            # First, get trending hashtags for the selected platform
-            # In a real app, this would use the social media platform's API
-            # Here we're using OpenAI to simulate this
-
-            response = client.chat.completions.create(model="gpt-4o",
-            messages=[
-                {"role": "system", "content": f"You are a social media trend expert for {platform}. Provide a list of 10 currently trending hashtags as a JSON array. Include only hashtag names without the # symbol."},
-                {"role": "user", "content": f"What are the current trending hashtags on {platform}?"}
-            ],
-            max_tokens=300,
-            response_format={"type": "json_object"})
-
-            import json
-            import random
-
-            try:
-                content = response.choices[0].message.content
-                data = json.loads(content)
-
-                # Extract hashtags
-                trending_hashtags = []
-                if isinstance(data, dict) and 'hashtags' in data:
-                    trending_hashtags = data['hashtags']
-                elif isinstance(data, list):
-                    trending_hashtags = data
-                else:
-                    # Try to extract from any JSON field that might contain the hashtags
-                    for key, value in data.items():
-                        if isinstance(value, list) and len(value) > 0:
-                            trending_hashtags = value
-                            break
-
-                # If we still don't have hashtags, fallback
-                if not trending_hashtags:
-                    trending_hashtags = ['fashion', 'travel', 'food', 'fitness', 'photography', 
-                                        'art', 'music', 'nature', 'technology', 'business']
-
-                # Clean the hashtags
-                trending_hashtags = [tag.strip('#') if isinstance(tag, str) else str(tag) for tag in trending_hashtags]
-
-                # Update or create trending hashtags with simulated metrics
-                refreshed_hashtags = []
-
-                for tag_name in trending_hashtags:
-                    # Generate realistic metrics
-                    post_count = random.randint(10000, 1000000)
-                    growth_rate = random.uniform(1.0, 15.0)  # 1% to 15% growth
-                    engagement_rate = random.uniform(1.0, 10.0)  # 1% to 10% engagement
-
-                    # Create or update the hashtag
-                    hashtag, created = Hashtag.objects.update_or_create(
-                        name=tag_name,
-                        defaults={
-                            'post_count': post_count,
-                            'growth_rate': growth_rate,
-                            'engagement_rate': engagement_rate,
-                            'is_trending': True,
-                            'last_updated': models.functions.Now()
-                        }
-                    )
-                    refreshed_hashtags.append(hashtag)
-
-                # Update some existing hashtags to keep the database current
-                # In a real app, you would pull actual metrics from social platforms
-                existing_hashtags = Hashtag.objects.exclude(name__in=trending_hashtags).order_by('?')[:20]
-                for hashtag in existing_hashtags:
-                    # Generate realistic updated metrics
-                    hashtag.post_count = max(1000, hashtag.post_count + random.randint(-5000, 10000))
-                    hashtag.growth_rate = max(0, min(20, hashtag.growth_rate + random.uniform(-2.0, 2.0)))
-                    hashtag.engagement_rate = max(0, min(15, hashtag.engagement_rate + random.uniform(-1.0, 1.0)))
-                    hashtag.is_trending = random.random() < 0.2  # 20% chance of being trending
-                    hashtag.save()
-                    refreshed_hashtags.append(hashtag)
+            trending_count = refresh_trending()
 
-                return Response({
-                    "message": f"Successfully refreshed hashtag data for {platform}",
-                    "refreshed_count": len(refreshed_hashtags),
-                    "trending_hashtags": HashtagSerializer(
-                        Hashtag.objects.filter(is_trending=True).order_by('-post_count')[:10], 
-                        many=True
-                    ).data
-                })
+            # The rest of the table is refreshed by a background job, never inside the request
+            queued = queue_refresh()
 
-            except json.JSONDecodeError as e:
-                logger.error(f"Error decoding JSON from OpenAI: {str(e)}")
-                return Response(
-                    {"error": "Error processing trending hashtags. Using fallback data."},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
+            return Response({
+                "message": f"Successfully refreshed hashtag data for {platform}",
+                "refreshed_count": trending_count,
+                "metrics_refresh_queued": queued,
+                "trending_hashtags": HashtagSerializer(
+                    Hashtag.objects.filter(is_trending=True).order_by('-engagement_rate', '-growth_rate')[:10], 
+                    many=True
+                ).data
+            })
 
         except Exception as e:
             logger.error(f"Error refreshing hashtag data: {str(e)}")
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from unfold.admin import ModelAdmin
-from .models import Post, PostPlatform, PostMetrics
+from .models import Post, PostPlatform, PostMetrics, ShortLink
 
 class PostPlatformInline(admin.TabularInline):
     model = PostPlatform
@@ -36,4 +36,11 @@ class PostPlatformAdmin(ModelAdmin):
 class PostMetricsAdmin(ModelAdmin):
     list_display = ('post', 'platform_post', 'impressions', 'reach', 'likes', 'comments')
     search_fields = ('post__content',)
-    raw_id_fields = ('post', 'platform_post') 
\ No newline at end of file
+    raw_id_fields = ('post', 'platform_post')
+
+@admin.register(ShortLink)
+class ShortLinkAdmin(ModelAdmin):
+    list_display = ('code', 'target_url', 'post', 'platform_post', 'created_at')
+    search_fields = ('code', 'target_url')
+    raw_id_fields = ('post', 'platform_post')
+    readonly_fields = ('created_at',)
@@ -0,0 +1,98 @@
+import logging
+import time
+
+from django.conf import settings
+
+from auth.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker shared by every worker through Redis.
+
+    Failures are counted in a sliding window; reaching the threshold opens the circuit.
+    Once reset_timeout has passed, a limited number of probe calls are let through:
+    one success closes the circuit again, one failure reopens it.
+    """
+
+    def __init__(self, name, failure_threshold=None, window=None, reset_timeout=None, half_open_probes=None):
+        config = settings.CIRCUIT_BREAKER
+        self.name = name
+        self.failure_threshold = failure_threshold or config["FAILURE_THRESHOLD"]
+        self.window = window or config["WINDOW"]
+        self.reset_timeout = reset_timeout or config["RESET_TIMEOUT"]
+        self.half_open_probes = half_open_probes or config["HALF_OPEN_PROBES"]
+
+        self.state_key = f"circuit:{name}"
+        self.failures_key = f"circuit:{name}:failures"
+
+    @classmethod
+    def for_provider(cls, provider):
+        return cls(f"provider:{provider}")
+
+    def _read(self):
+        data = get_redis().hgetall(self.state_key)
+        state = data.get(b"state", CLOSED.encode()).decode()
+        opened_at = float(data.get(b"opened_at", 0))
+        return state, opened_at
+
+    @property
+    def state(self):
+        state, opened_at = self._read()
+        if state == OPEN and time.time() - opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return state
+
+    def retry_after(self):
+        """Seconds until the circuit lets probe calls through again."""
+        state, opened_at = self._read()
+        if state != OPEN:
+            return 0
+        return max(0, int(opened_at + self.reset_timeout - time.time())) + 1
+
+    def allow(self):
+        state, opened_at = self._read()
+        if state == CLOSED:
+            return True
+
+        if state == OPEN:
+            if time.time() - opened_at < self.reset_timeout:
+                return False
+            get_redis().hset(self.state_key, mapping={"state": HALF_OPEN, "probes": 0})
+            logger.info(f"Circuit {self.name} is half-open, probing for recovery.")
+
+        probes = get_redis().hincrby(self.state_key, "probes", 1)
+        return probes <= self.half_open_probes
+
+    def record_success(self):
+        if self.state != CLOSED:
+            get_redis().delete(self.state_key, self.failures_key)
+            logger.info(f"Circuit {self.name} closed.")
+
+    def record_failure(self):
+        client = get_redis()
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+
+        with client.pipeline() as pipe:
+            pipe.incr(self.failures_key)
+            pipe.expire(self.failures_key, self.window, nx=True)
+            failures, _ = pipe.execute()
+
+        if failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        client = get_redis()
+        with client.pipeline() as pipe:
+            pipe.hset(self.state_key, mapping={"state": OPEN, "opened_at": time.time(), "probes": 0})
+            pipe.delete(self.failures_key)
+            pipe.execute()
+        logger.warning(f"Circuit {self.name} opened for {self.reset_timeout}s.")
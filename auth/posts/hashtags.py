@@ -0,0 +1,42 @@
+from content.hashtags import extract_hashtags, resolve_hashtags
+from .models import PostHashtag
+
+
+def sync_post_hashtags(posts):
+    """
+    Make PostHashtag rows match the hashtags in each post's content.
+    Works on any number of posts in a constant number of queries: one hashtag
+    upsert, one read of the current links, one delete and one insert.
+    """
+    posts = list(posts)
+    if not posts:
+        return 0
+
+    names_by_post = {post.id: extract_hashtags(post.content) for post in posts}
+    hashtag_ids = {
+        hashtag.name: hashtag.id
+        for hashtag in resolve_hashtags([name for names in names_by_post.values() for name in names])
+    }
+    wanted = {
+        (post_id, hashtag_ids[name])
+        for post_id, names in names_by_post.items()
+        for name in names if name in hashtag_ids
+    }
+
+    links = {
+        (post_id, hashtag_id): link_id
+        for link_id, post_id, hashtag_id in
+        PostHashtag.objects.filter(post_id__in=names_by_post).values_list('id', 'post_id', 'hashtag_id')
+    }
+    current = set(links)
+
+    stale = [links[pair] for pair in current - wanted]
+    if stale:
+        PostHashtag.objects.filter(id__in=stale).delete()
+
+    missing = wanted - current
+    PostHashtag.objects.bulk_create(
+        [PostHashtag(post_id=post_id, hashtag_id=hashtag_id) for post_id, hashtag_id in missing],
+        ignore_conflicts=True
+    )
+    return len(wanted)
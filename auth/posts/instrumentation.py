@@ -0,0 +1,93 @@
+import logging
+
+from auth.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Seconds; publish lag spans sub-second provider calls up to hour-long backlogs
+LAG_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+
+
+class Histogram:
+    """
+    Prometheus-style cumulative histogram labelled by provider.
+    Counts live in Redis so every web and worker process contributes to the same series.
+    """
+
+    registry = []
+
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.labels_key = f"metrics:hist:{name}:providers"
+        Histogram.registry.append(self)
+
+    def _key(self, provider):
+        return f"metrics:hist:{self.name}:{provider}"
+
+    def observe(self, value, provider):
+        if value is None:
+            return
+        value = max(value, 0)
+        try:
+            with get_redis().pipeline(transaction=False) as pipe:
+                key = self._key(provider)
+                for le in self.buckets:
+                    if value <= le:
+                        pipe.hincrby(key, str(le), 1)
+                pipe.hincrby(key, "+Inf", 1)
+                pipe.hincrbyfloat(key, "sum", value)
+                pipe.sadd(self.labels_key, provider)
+                pipe.execute()
+        except Exception as e:
+            # Instrumentation must never break publishing
+            logger.warning(f"Failed to record {self.name}: {str(e)}")
+
+    def render(self):
+        client = get_redis()
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for provider in sorted(p.decode() for p in client.smembers(self.labels_key)):
+            data = {k.decode(): v.decode() for k, v in client.hgetall(self._key(provider)).items()}
+            for le in self.buckets:
+                lines.append(f'{self.name}_bucket{{provider="{provider}",le="{le}"}} {data.get(str(le), 0)}')
+            lines.append(f'{self.name}_bucket{{provider="{provider}",le="+Inf"}} {data.get("+Inf", 0)}')
+            lines.append(f'{self.name}_sum{{provider="{provider}"}} {data.get("sum", 0)}')
+            lines.append(f'{self.name}_count{{provider="{provider}"}} {data.get("+Inf", 0)}')
+        return "\n".join(lines)
+
+
+dispatch_lag = Histogram(
+    "linkly_publish_dispatch_lag_seconds",
+    "Time from a post's scheduled time until its publish job was enqueued.",
+    LAG_BUCKETS,
+)
+queue_wait = Histogram(
+    "linkly_publish_queue_wait_seconds",
+    "Time a publish job waited in the queue before a worker picked it up.",
+    LAG_BUCKETS,
+)
+provider_latency = Histogram(
+    "linkly_publish_provider_latency_seconds",
+    "Time spent in the provider's publish API call.",
+    LATENCY_BUCKETS,
+)
+end_to_end_lag = Histogram(
+    "linkly_publish_end_to_end_lag_seconds",
+    "Time from a post's scheduled (or dispatch) time until it was published.",
+    LAG_BUCKETS,
+)
+
+
+def render_metrics():
+    return "\n".join(histogram.render() for histogram in Histogram.registry) + "\n"
+
+
+def seconds_between(start, end):
+    if start is None or end is None:
+        return None
+    return (end - start).total_seconds()
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from posts.hashtags import sync_post_hashtags
+from posts.models import Post
+
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Extracts hashtags from existing posts into PostHashtag, in id-ordered chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=CHUNK_SIZE, help='Posts per chunk')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_id = 0
+        posts = 0
+        links = 0
+
+        while True:
+            chunk = list(
+                Post.objects.filter(id__gt=last_id).order_by('id').only('id', 'content')[:batch_size]
+            )
+            if not chunk:
+                break
+
+            links += sync_post_hashtags(chunk)
+            posts += len(chunk)
+            last_id = chunk[-1].id
+            self.stdout.write(f"Processed {posts} posts ({links} hashtag links)")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled hashtags for {posts} posts."))
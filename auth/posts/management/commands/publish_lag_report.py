@@ -0,0 +1,85 @@
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from posts.models import PostPlatform
+
+PERCENTILES = (50, 90, 95, 99)
+CHUNK_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = 'Reports publish-lag percentiles per provider from stored PostPlatform timestamps'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', required=True, help='First day to include (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day to include (YYYY-MM-DD), defaults to today')
+        parser.add_argument('--provider', help='Only report on this provider')
+
+    def _parse_day(self, value):
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        start = self._parse_day(options['start'])
+        end = self._parse_day(options['end']) if options['end'] else timezone.now().date()
+        if end < start:
+            raise CommandError('--end must not be before --start')
+
+        tz = timezone.get_current_timezone()
+        start_dt = timezone.make_aware(datetime.combine(start, time.min), tz)
+        end_dt = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz)
+
+        queryset = PostPlatform.objects.filter(
+            status='published',
+            published_at__gte=start_dt,
+            published_at__lt=end_dt,
+            social_account__isnull=False,
+        )
+        if options['provider']:
+            queryset = queryset.filter(social_account__provider=options['provider'])
+
+        rows = queryset.annotate(
+            provider=F('social_account__provider'),
+            scheduled_time=F('post__scheduled_time'),
+            due_at=Coalesce('post__scheduled_time', 'dispatched_at'),
+        ).values_list(
+            'provider', 'scheduled_time', 'dispatched_at', 'started_at', 'published_at',
+            'provider_latency', 'due_at',
+        )
+
+        samples = {}
+        for provider, scheduled, dispatched, started, published, latency, due in rows.iterator(chunk_size=CHUNK_SIZE):
+            metrics = samples.setdefault(provider, {
+                'dispatch_lag': [], 'queue_wait': [], 'provider_latency': [], 'end_to_end': [],
+            })
+            if scheduled and dispatched:
+                metrics['dispatch_lag'].append((dispatched - scheduled).total_seconds())
+            if dispatched and started:
+                metrics['queue_wait'].append((started - dispatched).total_seconds())
+            if latency is not None:
+                metrics['provider_latency'].append(latency)
+            if due and published:
+                metrics['end_to_end'].append((published - due).total_seconds())
+
+        if not samples:
+            self.stdout.write(self.style.WARNING(f'No published posts between {start} and {end}'))
+            return
+
+        header = f"{'provider':<16}{'metric':<18}{'count':>8}" + ''.join(f"{'p' + str(p):>10}" for p in PERCENTILES)
+        self.stdout.write(f'Publish lag in seconds, {start} to {end}')
+        self.stdout.write(header)
+        for provider in sorted(samples):
+            for metric, values in samples[provider].items():
+                if not values:
+                    continue
+                quantiles = np.percentile(np.asarray(values, dtype=np.float64), PERCENTILES)
+                self.stdout.write(
+                    f"{provider:<16}{metric:<18}{len(values):>8}" + ''.join(f"{q:>10.2f}" for q in quantiles)
+                )
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:36
+
+import cloudinary.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0004_remove_post_link_description'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postmedia',
+            name='duration',
+            field=models.FloatField(blank=True, help_text='Duration in seconds for video/audio', null=True),
+        ),
+        migrations.AddField(
+            model_name='postmedia',
+            name='media_type',
+            field=models.CharField(choices=[('image', 'Image'), ('video', 'Video'), ('audio', 'Audio'), ('document', 'Document')], default='image', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='postmedia',
+            name='file',
+            field=cloudinary.models.CloudinaryField(max_length=255, verbose_name='media'),
+        ),
+        migrations.CreateModel(
+            name='ShortLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(max_length=16, unique=True)),
+                ('target_url', models.URLField(max_length=2048)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('platform_post', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='short_links', to='posts.postplatform')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='short_links', to='posts.post')),
+            ],
+        ),
+    ]
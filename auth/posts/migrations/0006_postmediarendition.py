@@ -0,0 +1,32 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_shortlink'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostMediaRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('platform', models.CharField(max_length=20)),
+                ('spec_key', models.CharField(help_text='Hash of the platform spec used to build this rendition', max_length=64)),
+                ('url', models.URLField(max_length=1024)),
+                ('public_id', models.CharField(blank=True, max_length=255)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('size_bytes', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('media', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='posts.postmedia')),
+            ],
+            options={
+                'unique_together': {('media', 'platform', 'spec_key')},
+            },
+        ),
+    ]
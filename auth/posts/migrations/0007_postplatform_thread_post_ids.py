@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_postmediarendition'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postplatform',
+            name='thread_post_ids',
+            field=models.JSONField(blank=True, default=list, help_text='Ids of every part published so far for multi-part posts such as threads'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_postplatform_thread_post_ids'),
+        ('socialaccount', '0006_alter_socialaccount_extra_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postplatform',
+            name='dispatched_at',
+            field=models.DateTimeField(blank=True, help_text='When the publish job was enqueued', null=True),
+        ),
+        migrations.AddField(
+            model_name='postplatform',
+            name='provider_latency',
+            field=models.FloatField(blank=True, help_text='Provider API time in seconds', null=True),
+        ),
+        migrations.AddField(
+            model_name='postplatform',
+            name='started_at',
+            field=models.DateTimeField(blank=True, help_text='When a worker started publishing', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='postplatform',
+            index=models.Index(fields=['published_at'], name='postplatform_published_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.1 on 2026-10-19 08:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0005_userhashtagstat'),
+        ('posts', '0008_postplatform_publish_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostHashtag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('hashtag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_hashtags', to='content.hashtag')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_hashtags', to='posts.post')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hashtag', 'post'], name='posthashtag_hashtag_post_idx')],
+                'unique_together': {('post', 'hashtag')},
+            },
+        ),
+    ]
@@ -62,14 +62,26 @@ class PostPlatform(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
     platform_post_id = models.CharField(max_length=255, blank=True)
     platform_post_url = models.URLField(blank=True)
+    thread_post_ids = models.JSONField(
+        default=list, blank=True,
+        help_text="Ids of every part published so far for multi-part posts such as threads"
+    )
     error_message = models.TextField(blank=True)
 
+    # Publish pipeline timestamps, used for publish-lag reporting
+    dispatched_at = models.DateTimeField(null=True, blank=True, help_text="When the publish job was enqueued")
+    started_at = models.DateTimeField(null=True, blank=True, help_text="When a worker started publishing")
+    provider_latency = models.FloatField(null=True, blank=True, help_text="Provider API time in seconds")
+
     published_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('post', 'social_app')
+        indexes = [
+            models.Index(fields=['published_at'], name='postplatform_published_idx'),
+        ]
 
     def __str__(self):
         return f"{self.post} on {self.social_app.provider}"
@@ -121,3 +133,55 @@ class PostMetrics(models.Model):
 
     def __str__(self):
         return f"Metrics for {self.post} on {self.platform_post.social_app.provider}"
+
+
+class PostHashtag(models.Model):
+    """Hashtags used in a post's content, extracted whenever the post is saved."""
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='post_hashtags')
+    hashtag = models.ForeignKey('content.Hashtag', on_delete=models.CASCADE, related_name='post_hashtags')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('post', 'hashtag')
+        indexes = [
+            models.Index(fields=['hashtag', 'post'], name='posthashtag_hashtag_post_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.hashtag_id} in {self.post}"
+
+
+class ShortLink(models.Model):
+    code = models.CharField(max_length=16, unique=True)
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='short_links')
+    platform_post = models.ForeignKey(
+        PostPlatform, on_delete=models.CASCADE, related_name='short_links',
+        null=True, blank=True
+    )
+    target_url = models.URLField(max_length=2048)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.code} -> {self.target_url}"
+
+
+class PostMediaRendition(models.Model):
+    media = models.ForeignKey(PostMedia, on_delete=models.CASCADE, related_name='renditions')
+    platform = models.CharField(max_length=20)
+    spec_key = models.CharField(max_length=64, help_text='Hash of the platform spec used to build this rendition')
+
+    url = models.URLField(max_length=1024)
+    public_id = models.CharField(max_length=255, blank=True)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    size_bytes = models.PositiveIntegerField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('media', 'platform', 'spec_key')
+
+    def __str__(self):
+        return f"{self.platform} rendition of media {self.media_id}"
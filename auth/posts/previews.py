@@ -0,0 +1,212 @@
+import hashlib
+import ipaddress
+import logging
+import socket
+import threading
+import time
+from html.parser import HTMLParser
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+import requests
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+MAX_BYTES = 256 * 1024
+CHUNK_SIZE = 16 * 1024
+FETCH_TIMEOUT = 5
+MAX_REDIRECTS = 3
+
+CACHE_TTL = 6 * 60 * 60
+FAILURE_CACHE_TTL = 10 * 60
+LOCK_TTL = FETCH_TIMEOUT * (MAX_REDIRECTS + 1) + 2
+WAIT_INTERVAL = 0.1
+
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid')
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+USER_AGENT = "LinklyPreviewBot/1.0 (+https://linklymvp.web.app)"
+
+
+class PreviewError(Exception):
+    pass
+
+
+class _MetaParser(HTMLParser):
+    """Collects OG/Twitter-card tags and the title; stops caring once </head> is seen."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.meta = {}
+        self.title = ''
+        self.done = False
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'meta':
+            attrs = dict(attrs)
+            key = (attrs.get('property') or attrs.get('name') or '').lower()
+            content = attrs.get('content')
+            if content and (key.startswith('og:') or key.startswith('twitter:') or key == 'description'):
+                self.meta.setdefault(key, content.strip())
+        elif tag == 'title':
+            self._in_title = True
+        elif tag == 'body':
+            self.done = True
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+        elif tag == 'head':
+            self.done = True
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+
+
+def normalize_url(url):
+    """Canonical form used as the cache key: lowercase host, no fragment, no tracking params."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        raise PreviewError("Only http and https URLs can be previewed.")
+
+    host = parts.hostname.lower()
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunsplit((scheme, host, parts.path or '/', urlencode(query), ''))
+
+
+def _check_public_host(url):
+    hostname = urlsplit(url).hostname
+    try:
+        addresses = {info[4][0] for info in socket.getaddrinfo(hostname, None)}
+    except socket.gaierror:
+        raise PreviewError("Could not resolve host.")
+
+    for address in addresses:
+        ip = ipaddress.ip_address(address)
+        if not ip.is_global:
+            raise PreviewError("URL resolves to a non-public address.")
+
+
+def _fetch(url):
+    """Stream the page, feeding the parser until </head> or the byte cap is reached."""
+    for _ in range(MAX_REDIRECTS + 1):
+        _check_public_host(url)
+        response = requests.get(
+            url,
+            stream=True,
+            timeout=FETCH_TIMEOUT,
+            allow_redirects=False,
+            headers={'User-Agent': USER_AGENT, 'Accept': 'text/html'},
+        )
+        if response.is_redirect:
+            url = urljoin(url, response.headers.get('Location', ''))
+            response.close()
+            continue
+        break
+    else:
+        raise PreviewError("Too many redirects.")
+
+    try:
+        if response.status_code != 200:
+            raise PreviewError(f"Upstream returned {response.status_code}.")
+        if 'html' not in response.headers.get('Content-Type', ''):
+            raise PreviewError("URL is not an HTML page.")
+
+        parser = _MetaParser()
+        encoding = response.encoding or 'utf-8'
+        received = 0
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            received += len(chunk)
+            parser.feed(chunk.decode(encoding, errors='replace'))
+            if parser.done or received >= MAX_BYTES:
+                break
+    finally:
+        response.close()
+
+    meta = parser.meta
+    return {
+        'url': meta.get('og:url') or url,
+        'title': meta.get('og:title') or meta.get('twitter:title') or parser.title.strip(),
+        'description': meta.get('og:description') or meta.get('twitter:description') or meta.get('description', ''),
+        'image': meta.get('og:image') or meta.get('twitter:image') or meta.get('twitter:image:src', ''),
+        'site_name': meta.get('og:site_name', ''),
+        'type': meta.get('og:type', ''),
+        'twitter_card': meta.get('twitter:card', ''),
+    }
+
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _cache_key(normalized):
+    return f"linkpreview:{hashlib.sha256(normalized.encode()).hexdigest()}"
+
+
+def _fetch_and_cache(normalized, key):
+    """Fetch once across all workers: the first caller holds a cache lock, the rest wait for its result."""
+    lock_key = f"{key}:lock"
+    if not cache.add(lock_key, 1, timeout=LOCK_TTL):
+        deadline = time.monotonic() + LOCK_TTL
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_INTERVAL)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+            if cache.get(lock_key) is None:
+                break
+
+    try:
+        try:
+            preview = {'ok': True, 'data': _fetch(normalized)}
+            cache.set(key, preview, timeout=CACHE_TTL)
+        except (PreviewError, requests.RequestException) as e:
+            logger.info(f"Link preview failed for {normalized}: {str(e)}")
+            preview = {'ok': False, 'error': str(e)}
+            cache.set(key, preview, timeout=FAILURE_CACHE_TTL)
+        return preview
+    finally:
+        cache.delete(lock_key)
+
+
+def get_preview(url):
+    """
+    Return preview metadata for a URL.
+    Results are shared across users by normalized URL and concurrent requests are coalesced.
+    """
+    normalized = normalize_url(url)
+    key = _cache_key(normalized)
+
+    cached = cache.get(key)
+    if cached is None:
+        with _inflight_lock:
+            event = _inflight.get(key)
+            leader = event is None
+            if leader:
+                event = _inflight[key] = threading.Event()
+
+        if leader:
+            try:
+                cached = _fetch_and_cache(normalized, key)
+            finally:
+                with _inflight_lock:
+                    _inflight.pop(key, None)
+                event.set()
+        else:
+            event.wait(LOCK_TTL)
+            cached = cache.get(key)
+            if cached is None:
+                raise PreviewError("Timed out waiting for preview.")
+
+    if not cached['ok']:
+        raise PreviewError(cached['error'])
+    return cached['data']
@@ -1,5 +1,8 @@
 import requests
 
+REQUEST_TIMEOUT = 10
+
+
 def post(text, social_token, linkedin_uid):
     try:
         access_token = social_token.token
@@ -24,11 +27,43 @@ def post(text, social_token, linkedin_uid):
             "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
         }
 
-        response = requests.post(url, json=post_data, headers=headers)
+        response = requests.post(url, json=post_data, headers=headers, timeout=REQUEST_TIMEOUT)
 
         if response.status_code in [200, 201]:
             return {"success": True, "post_id": response.headers.get("x-restli-id")}
+        else:
+            return {"success": False, "error": response.text, "status_code": response.status_code}
+    except Exception as e:
+        return {"success": False, "error": str(e), "status_code": None}
+
+
+def refresh_token(social_token, timeout=REQUEST_TIMEOUT):
+    """Exchange the stored refresh token (token_secret for OAuth2) for a new access token."""
+    try:
+        if not social_token.token_secret:
+            return {"success": False, "error": "No refresh token stored for this account."}
+
+        app = social_token.app
+        response = requests.post(
+            "https://www.linkedin.com/oauth/v2/accessToken",
+            data={
+                "grant_type": "refresh_token",
+                "refresh_token": social_token.token_secret,
+                "client_id": app.client_id,
+                "client_secret": app.secret,
+            },
+            timeout=timeout,
+        )
+
+        if response.status_code == 200:
+            data = response.json()
+            return {
+                "success": True,
+                "access_token": data["access_token"],
+                "expires_in": data.get("expires_in"),
+                "refresh_token": data.get("refresh_token"),
+            }
         else:
             return {"success": False, "error": response.text}
     except Exception as e:
-        return {"success": False, "error": str(e)}
\ No newline at end of file
+        return {"success": False, "error": str(e)}
@@ -1,7 +1,70 @@
+import re
+
 import requests
 from requests_oauthlib import OAuth1
 
-def post(text, social_token):
+REQUEST_TIMEOUT = 10
+TWEET_LIMIT = 280
+# Room for the " (12/34)" counter appended to each part of a thread
+COUNTER_RESERVE = 8
+
+SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _split_long(text, limit):
+    """Break a single over-long sentence on word boundaries, hard-splitting oversized words."""
+    chunks = []
+    current = ''
+    for word in WHITESPACE_RE.split(text):
+        while len(word) > limit:
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.append(word[:limit])
+            word = word[limit:]
+        if not word:
+            continue
+        candidate = f"{current} {word}" if current else word
+        if len(candidate) <= limit:
+            current = candidate
+        else:
+            chunks.append(current)
+            current = word
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def split_thread(text, limit=TWEET_LIMIT):
+    """Split text into tweet-sized parts on sentence boundaries, numbered when more than one."""
+    text = text.strip()
+    if len(text) <= limit:
+        return [text]
+
+    body_limit = limit - COUNTER_RESERVE
+    parts = []
+    current = ''
+    for paragraph in text.split('\n'):
+        for sentence in SENTENCE_RE.split(paragraph.strip()):
+            if not sentence:
+                continue
+            pieces = [sentence] if len(sentence) <= body_limit else _split_long(sentence, body_limit)
+            for piece in pieces:
+                candidate = f"{current} {piece}" if current else piece
+                if len(candidate) <= body_limit:
+                    current = candidate
+                else:
+                    parts.append(current)
+                    current = piece
+    if current:
+        parts.append(current)
+
+    total = len(parts)
+    return [f"{part} ({index}/{total})" for index, part in enumerate(parts, start=1)]
+
+
+def post(text, social_token, in_reply_to=None):
     try:
         token = social_token.token
         token_secret = social_token.token_secret
@@ -16,11 +79,34 @@ def post(text, social_token):
 
         url = "https://api.twitter.com/2/tweets"
         payload = {"text": text}
-        response = requests.post(url, json=payload, auth=auth)
+        if in_reply_to:
+            payload["reply"] = {"in_reply_to_tweet_id": in_reply_to}
+        response = requests.post(url, json=payload, auth=auth, timeout=REQUEST_TIMEOUT)
 
         if response.status_code in [200, 201]:
             return {"success": True, "tweet_id": response.json().get("data", {}).get("id")}
         else:
-            return {"success": False, "error": response.text}
+            return {"success": False, "error": response.text, "status_code": response.status_code}
     except Exception as e:
-        return {"success": False, "error": str(e)}
\ No newline at end of file
+        return {"success": False, "error": str(e), "status_code": None}
+
+
+def post_thread(parts, social_token, published_ids=None, on_published=None):
+    """
+    Publish parts as a chain of replies.
+    published_ids holds tweets already sent by an earlier attempt; publishing resumes after
+    the last of them. on_published is called with each new tweet id as soon as it exists.
+    """
+    tweet_ids = list(published_ids or [])
+
+    for text in parts[len(tweet_ids):]:
+        in_reply_to = tweet_ids[-1] if tweet_ids else None
+        result = post(text, social_token, in_reply_to=in_reply_to)
+        if not result.get("success"):
+            return {**result, "tweet_ids": tweet_ids}
+
+        tweet_ids.append(result["tweet_id"])
+        if on_published:
+            on_published(tweet_ids)
+
+    return {"success": True, "tweet_id": tweet_ids[0] if tweet_ids else None, "tweet_ids": tweet_ids}
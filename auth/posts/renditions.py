@@ -0,0 +1,201 @@
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import cloudinary.uploader
+import requests
+from django.conf import settings
+from PIL import Image, ImageOps
+
+from .models import PostMediaRendition
+
+logger = logging.getLogger(__name__)
+
+# Size, aspect and encoding requirements per network. Aspect ratios are width / height.
+PLATFORM_SPECS = {
+    'twitter': {
+        'max_width': 1600, 'max_height': 1600,
+        'min_aspect': 0.75, 'max_aspect': 16 / 9,
+        'format': 'JPEG', 'quality': 85, 'max_bytes': 5 * 1024 * 1024,
+    },
+    'linkedin': {
+        'max_width': 1200, 'max_height': 1200,
+        'min_aspect': 1 / 1.3, 'max_aspect': 1.91,
+        'format': 'JPEG', 'quality': 85, 'max_bytes': 5 * 1024 * 1024,
+    },
+    'instagram': {
+        'max_width': 1080, 'max_height': 1350,
+        'min_aspect': 0.8, 'max_aspect': 1.91,
+        'format': 'JPEG', 'quality': 85, 'max_bytes': 8 * 1024 * 1024,
+    },
+    'facebook': {
+        'max_width': 2048, 'max_height': 2048,
+        'min_aspect': 0.5, 'max_aspect': 2.0,
+        'format': 'JPEG', 'quality': 85, 'max_bytes': 4 * 1024 * 1024,
+    },
+}
+
+# allauth provider ids that publish through one of the specs above
+PROVIDER_ALIASES = {
+    'openid_connect': 'linkedin',
+}
+
+MIN_QUALITY = 50
+DOWNLOAD_TIMEOUT = 15
+
+
+def spec_key(spec):
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def platform_for_provider(provider):
+    return PROVIDER_ALIASES.get(provider, provider)
+
+
+def render(image_bytes, spec):
+    """
+    Crop to the allowed aspect range, downscale and recompress an image.
+    Runs in a pool process, so it only takes and returns plain data.
+    """
+    image = Image.open(io.BytesIO(image_bytes))
+    image = ImageOps.exif_transpose(image)
+
+    width, height = image.size
+    aspect = width / height
+    if aspect > spec['max_aspect']:
+        new_width = int(height * spec['max_aspect'])
+        left = (width - new_width) // 2
+        image = image.crop((left, 0, left + new_width, height))
+    elif aspect < spec['min_aspect']:
+        new_height = int(width / spec['min_aspect'])
+        top = (height - new_height) // 2
+        image = image.crop((0, top, width, top + new_height))
+
+    image.thumbnail((spec['max_width'], spec['max_height']), Image.Resampling.LANCZOS)
+
+    if spec['format'] == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    quality = spec['quality']
+    while True:
+        output = io.BytesIO()
+        image.save(output, format=spec['format'], quality=quality, optimize=True, progressive=True)
+        data = output.getvalue()
+        if len(data) <= spec['max_bytes'] or quality <= MIN_QUALITY:
+            break
+        quality -= 10
+
+    return data, image.width, image.height
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """
+    Lazily create the rendition process pool.
+    Daemonic processes (e.g. Celery prefork children) cannot fork a pool, so they render inline.
+    """
+    global _executor
+    if multiprocessing.current_process().daemon:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=settings.RENDITION_WORKERS)
+    return _executor
+
+
+def _upload(data, media, platform, key):
+    result = cloudinary.uploader.upload(
+        io.BytesIO(data),
+        folder='post_media/renditions',
+        public_id=f"{media.id}_{platform}_{key}",
+        overwrite=True,
+        resource_type='image',
+    )
+    return result['secure_url'], result['public_id']
+
+
+def build_renditions(post):
+    """Build every missing per-platform rendition for a post's images."""
+    platforms = set()
+    for pp in post.post_platforms.select_related('social_account', 'social_app'):
+        provider = pp.social_account.provider if pp.social_account else pp.social_app.provider
+        platform = platform_for_provider(provider)
+        if platform in PLATFORM_SPECS:
+            platforms.add(platform)
+
+    media_items = list(post.media.filter(media_type='image'))
+    if not platforms or not media_items:
+        return 0
+
+    existing = set(
+        PostMediaRendition.objects.filter(media__in=media_items)
+        .values_list('media_id', 'platform', 'spec_key')
+    )
+
+    executor = _get_executor()
+    jobs = []
+    for media in media_items:
+        missing = [
+            platform for platform in platforms
+            if (media.id, platform, spec_key(PLATFORM_SPECS[platform])) not in existing
+        ]
+        if not missing:
+            continue
+
+        try:
+            response = requests.get(media.get_url(), timeout=DOWNLOAD_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.error(f"Failed to download media {media.id} for renditions: {str(e)}")
+            continue
+
+        for platform in missing:
+            spec = PLATFORM_SPECS[platform]
+            if executor:
+                result = executor.submit(render, response.content, spec)
+            else:
+                result = render(response.content, spec)
+            jobs.append((media, platform, result))
+
+    renditions = []
+    for media, platform, result in jobs:
+        try:
+            data, width, height = result.result() if executor else result
+            key = spec_key(PLATFORM_SPECS[platform])
+            url, public_id = _upload(data, media, platform, key)
+        except Exception as e:
+            logger.error(f"Failed to build {platform} rendition for media {media.id}: {str(e)}")
+            continue
+
+        renditions.append(PostMediaRendition(
+            media=media,
+            platform=platform,
+            spec_key=key,
+            url=url,
+            public_id=public_id,
+            width=width,
+            height=height,
+            size_bytes=len(data),
+        ))
+
+    PostMediaRendition.objects.bulk_create(renditions, ignore_conflicts=True)
+    return len(renditions)
+
+
+def get_rendition_url(media, provider):
+    """URL of the prebuilt rendition for a provider, or the original if none exists."""
+    platform = platform_for_provider(provider)
+    spec = PLATFORM_SPECS.get(platform)
+    if spec:
+        rendition = media.renditions.filter(platform=platform, spec_key=spec_key(spec)).first()
+        if rendition:
+            return rendition.url
+    return media.get_url()
@@ -69,6 +69,7 @@ class PostPlatformSerializer(serializers.ModelSerializer):
             "status",
             "platform_post_id",
             "platform_post_url",
+            "thread_post_ids",
             "error_message",
             "published_at",
             "metrics",
@@ -78,6 +79,7 @@ class PostPlatformSerializer(serializers.ModelSerializer):
             "status",
             "platform_post_id",
             "platform_post_url",
+            "thread_post_ids",
             "error_message",
             "published_at",
         ]
@@ -0,0 +1,180 @@
+import json
+import logging
+import re
+import secrets
+import string
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Value, When
+
+from auth.redis_client import get_redis
+from .models import PostMetrics, PostPlatform, ShortLink
+
+logger = logging.getLogger(__name__)
+
+URL_RE = re.compile(r'https?://[^\s<>"\']+')
+CODE_ALPHABET = string.ascii_letters + string.digits
+CODE_LENGTH = 7
+
+LINK_KEY = "shortlink:{}"
+CLICKS_KEY = "shortlink:clicks"
+CLICKS_FLUSH_KEY = "shortlink:clicks:flushing"
+
+LOCAL_CACHE_SIZE = 10000
+
+
+class _LocalLinkCache:
+    """Small per-process LRU in front of Redis so hot links never leave the worker."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, code):
+        with self._lock:
+            link = self._data.get(code)
+            if link is not None:
+                self._data.move_to_end(code)
+            return link
+
+    def set(self, code, link):
+        with self._lock:
+            self._data[code] = link
+            self._data.move_to_end(code)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+_local_cache = _LocalLinkCache(LOCAL_CACHE_SIZE)
+
+
+def _serialize(link):
+    return json.dumps({
+        "url": link.target_url,
+        "post": link.post_id,
+        "platform_post": link.platform_post_id,
+    })
+
+
+def _generate_code():
+    return ''.join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+
+
+def get_short_url(code):
+    return f"{settings.SHORT_LINK_BASE_URL.rstrip('/')}/{code}"
+
+
+def create_short_link(post, target_url, platform_post=None):
+    """Return the short link for a target URL, creating and caching it if needed."""
+    link = ShortLink.objects.filter(
+        post=post, platform_post=platform_post, target_url=target_url
+    ).first()
+    if link is None:
+        while True:
+            code = _generate_code()
+            if not ShortLink.objects.filter(code=code).exists():
+                break
+        link = ShortLink.objects.create(
+            code=code, post=post, platform_post=platform_post, target_url=target_url
+        )
+    get_redis().set(LINK_KEY.format(link.code), _serialize(link))
+    return link
+
+
+def shorten_content(text, post, platform_post=None):
+    """Replace every URL in the text with a click-tracking short link."""
+    def replace(match):
+        link = create_short_link(post, match.group(0), platform_post)
+        return get_short_url(link.code)
+
+    return URL_RE.sub(replace, text)
+
+
+def resolve(code):
+    """
+    Look up a short link without touching the database.
+    Returns a dict with url, post and platform_post, or None on a cache miss.
+    """
+    link = _local_cache.get(code)
+    if link is not None:
+        return link
+
+    raw = get_redis().get(LINK_KEY.format(code))
+    if raw is None:
+        return None
+
+    link = json.loads(raw)
+    _local_cache.set(code, link)
+    return link
+
+
+def resolve_from_db(code):
+    """Cold path for links evicted from Redis; re-warms both cache layers."""
+    try:
+        link = ShortLink.objects.get(code=code)
+    except ShortLink.DoesNotExist:
+        return None
+
+    raw = _serialize(link)
+    get_redis().set(LINK_KEY.format(code), raw)
+    data = json.loads(raw)
+    _local_cache.set(code, data)
+    return data
+
+
+def record_click(link):
+    """Buffer a click in Redis; flush_clicks() moves the totals into PostMetrics."""
+    field = f"{link['post']}:{link['platform_post'] or ''}"
+    get_redis().hincrby(CLICKS_KEY, field, 1)
+
+
+def flush_clicks():
+    """Apply buffered click counts to PostMetrics in a constant number of queries."""
+    client = get_redis()
+    if not client.exists(CLICKS_FLUSH_KEY):
+        try:
+            client.rename(CLICKS_KEY, CLICKS_FLUSH_KEY)
+        except Exception:
+            # Nothing buffered since the last flush
+            return 0
+
+    buffered = client.hgetall(CLICKS_FLUSH_KEY)
+
+    clicks = {}
+    for field, count in buffered.items():
+        post_id, _, platform_post_id = field.decode().partition(':')
+        if not platform_post_id:
+            logger.warning(f"Dropping {int(count)} clicks for post {post_id} without a platform post.")
+            continue
+        clicks[int(platform_post_id)] = clicks.get(int(platform_post_id), 0) + int(count)
+
+    if clicks:
+        existing = set(
+            PostMetrics.objects.filter(platform_post_id__in=clicks)
+            .values_list('platform_post_id', flat=True)
+        )
+
+        if existing:
+            PostMetrics.objects.filter(platform_post_id__in=existing).update(
+                clicks=F('clicks') + Case(
+                    *[When(platform_post_id=pp_id, then=Value(clicks[pp_id])) for pp_id in existing],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                )
+            )
+
+        missing = [pp_id for pp_id in clicks if pp_id not in existing]
+        if missing:
+            post_ids = dict(
+                PostPlatform.objects.filter(id__in=missing).values_list('id', 'post_id')
+            )
+            PostMetrics.objects.bulk_create([
+                PostMetrics(post_id=post_ids[pp_id], platform_post_id=pp_id, clicks=clicks[pp_id])
+                for pp_id in missing if pp_id in post_ids
+            ])
+
+    client.delete(CLICKS_FLUSH_KEY)
+    return sum(clicks.values())
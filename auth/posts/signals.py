@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .hashtags import sync_post_hashtags
+from .models import Post
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, update_fields=None, **kwargs):
+    # Saves that do not touch the content cannot change its hashtags
+    if update_fields is not None and 'content' not in update_fields:
+        return
+    sync_post_hashtags([instance])
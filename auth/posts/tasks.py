@@ -1,16 +1,80 @@
 from celery import shared_task
 from allauth.socialaccount.models import SocialAccount, SocialToken
 from django.utils import timezone
+from datetime import timedelta
+import time
 
+from account.models import SocialAccountHealth
 from .providers import linkedin, twitter
 from .models import Post
+from . import instrumentation, renditions, shortlinks, tokens
+from .circuit import CircuitBreaker
 import logging
 
 logger = logging.getLogger(__name__)
 
+MAX_PUBLISH_ATTEMPTS = 5
+RETRY_BACKOFF = 60
+
+
+def _is_provider_failure(result):
+    """Timeouts, connection errors, 5xx and 429 point at the provider rather than the post."""
+    status_code = result.get("status_code")
+    return status_code is None or status_code >= 500 or status_code == 429
+
+
+def _publish_twitter_thread(content, social_token, platform_post):
+    """
+    Publish content as a thread, saving each tweet id as it goes so a retry
+    resumes after the last published part instead of duplicating tweets.
+    """
+    parts = twitter.split_thread(content)
+    published_ids = platform_post.thread_post_ids if platform_post else []
+
+    def save_progress(tweet_ids):
+        if platform_post:
+            platform_post.thread_post_ids = tweet_ids
+            platform_post.save(update_fields=["thread_post_ids", "updated_at"])
+
+    if published_ids:
+        logger.info(
+            f"Resuming thread for post {platform_post.post_id} after {len(published_ids)} of {len(parts)} tweets."
+        )
+
+    return twitter.post_thread(parts, social_token, published_ids, on_published=save_progress)
+
+
+def _record_publish_result(platform_post, result):
+    if result.get("success"):
+        platform_post.status = "published"
+        platform_post.platform_post_id = result.get("tweet_id") or result.get("post_id") or ""
+        platform_post.error_message = ""
+        platform_post.published_at = timezone.now()
+
+        if platform_post.social_account:
+            instrumentation.end_to_end_lag.observe(
+                instrumentation.seconds_between(
+                    platform_post.post.scheduled_time or platform_post.dispatched_at,
+                    platform_post.published_at,
+                ),
+                platform_post.social_account.provider,
+            )
+    else:
+        platform_post.status = "failed"
+        platform_post.error_message = result.get("error") or ""
+    platform_post.save()
+
+
+def _reschedule(post, platform_post, account_id, attempt, countdown):
+    if platform_post:
+        # Queue wait for the retry is measured from when it becomes due
+        platform_post.dispatched_at = timezone.now() + timedelta(seconds=countdown)
+        platform_post.save(update_fields=["dispatched_at", "updated_at"])
+    publish_post_task.apply_async((post.id, [account_id], attempt), countdown=countdown)
+
 
 @shared_task
-def publish_post_task(post_id, social_account_ids):
+def publish_post_task(post_id, social_account_ids, attempt=0):
     try:
         post = Post.objects.get(id=post_id)
     except Post.DoesNotExist:
@@ -27,22 +91,75 @@ def publish_post_task(post_id, social_account_ids):
                 logger.warning(f"No token found for SocialAccount ID {account_id}.")
                 continue
 
+            # Tokens are refreshed ahead of time by refresh_social_tokens_task; never refresh inline
+            platform_post = post.post_platforms.filter(social_account=social_account).first()
+            expired = social_token.expires_at and social_token.expires_at <= timezone.now()
+            flagged = SocialAccountHealth.objects.filter(
+                social_account=social_account, needs_reauth=True
+            ).exists()
+            if expired or flagged:
+                logger.warning(f"SocialAccount ID {account_id} must be reconnected before publishing.")
+                if platform_post:
+                    _record_publish_result(platform_post, {
+                        "success": False,
+                        "error": "The access token for this account has expired. Please reconnect it.",
+                    })
+                continue
+
+            if provider not in ("twitter", "linkedin"):
+                logger.warning(f"Unsupported provider: {provider}")
+                continue
+
+            if platform_post:
+                platform_post.started_at = timezone.now()
+                platform_post.save(update_fields=["started_at", "updated_at"])
+                instrumentation.queue_wait.observe(
+                    instrumentation.seconds_between(platform_post.dispatched_at, platform_post.started_at),
+                    provider,
+                )
+
+            # Fail fast while the provider is down instead of tying up the worker on it
+            breaker = CircuitBreaker.for_provider(provider)
+            if not breaker.allow():
+                countdown = breaker.retry_after()
+                logger.warning(
+                    f"Circuit open for {provider}; rescheduling post {post.id} "
+                    f"(SocialAccount ID: {account_id}) in {countdown}s."
+                )
+                _reschedule(post, platform_post, account_id, attempt, countdown)
+                continue
+
             logger.info(
                 f"Publishing post {post.id} to {provider} (SocialAccount ID: {account_id})"
             )
 
+            content = shortlinks.shorten_content(post.content, post, platform_post)
+
+            provider_started = time.monotonic()
             if provider == "twitter":
-                result = twitter.post(post.content, social_token)
-            elif provider == "linkedin":
-                result = linkedin.post(post.content, social_token, social_account.uid)
+                result = _publish_twitter_thread(content, social_token, platform_post)
             else:
-                logger.warning(f"Unsupported provider: {provider}")
-                continue
+                result = linkedin.post(content, social_token, social_account.uid)
+            latency = time.monotonic() - provider_started
+            instrumentation.provider_latency.observe(latency, provider)
+            if platform_post:
+                platform_post.provider_latency = latency
 
             if result.get("success"):
+                breaker.record_success()
                 logger.info(f"Post {post.id} published to {provider}.")
             else:
                 logger.error(f"Failed to post to {provider}: {result.get('error')}")
+                if _is_provider_failure(result):
+                    breaker.record_failure()
+                    if attempt + 1 < MAX_PUBLISH_ATTEMPTS:
+                        countdown = RETRY_BACKOFF * 2 ** attempt
+                        logger.info(f"Retrying post {post.id} on {provider} in {countdown}s.")
+                        _reschedule(post, platform_post, account_id, attempt + 1, countdown)
+                        continue
+
+            if platform_post:
+                _record_publish_result(platform_post, result)
 
         except SocialAccount.DoesNotExist:
             logger.warning(
@@ -56,3 +173,33 @@ def publish_post_task(post_id, social_account_ids):
     post.save()
 
     return {"status": "success", "post_id": post.id}
+
+
+@shared_task
+def flush_link_clicks_task():
+    flushed = shortlinks.flush_clicks()
+    if flushed:
+        logger.info(f"Flushed {flushed} short link clicks to PostMetrics.")
+    return flushed
+
+
+@shared_task
+def build_post_renditions_task(post_id):
+    try:
+        post = Post.objects.get(id=post_id)
+    except Post.DoesNotExist:
+        logger.error(f"Post with ID {post_id} does not exist.")
+        return 0
+
+    built = renditions.build_renditions(post)
+    logger.info(f"Built {built} media renditions for post {post_id}.")
+    return built
+
+
+@shared_task
+def refresh_social_tokens_task():
+    result = tokens.refresh_expiring_tokens()
+    logger.info(
+        f"Refreshed {result['refreshed']} social tokens, {result['failed']} need re-authentication."
+    )
+    return result
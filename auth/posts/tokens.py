@@ -0,0 +1,95 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from allauth.socialaccount.models import SocialToken
+from django.conf import settings
+from django.utils import timezone
+
+from account.models import SocialAccountHealth
+from .providers import linkedin
+
+logger = logging.getLogger(__name__)
+
+# Providers whose tokens expire and can be refreshed without the user
+REFRESHERS = {
+    "linkedin": linkedin.refresh_token,
+    "openid_connect": linkedin.refresh_token,
+}
+
+BATCH_SIZE = 50
+
+
+def _refresh(social_token):
+    refresher = REFRESHERS.get(social_token.account.provider)
+    if refresher is None:
+        return {"success": False, "error": f"Token refresh is not supported for {social_token.account.provider}."}
+    return refresher(social_token)
+
+
+def refresh_expiring_tokens(window=None):
+    """
+    Refresh every token expiring within the window, in concurrent batches.
+    Accounts whose token cannot be refreshed are flagged as needing re-authentication.
+    """
+    window = window or timedelta(hours=settings.TOKEN_REFRESH_WINDOW_HOURS)
+    now = timezone.now()
+
+    # Range scan on the expires_at index; accounts already flagged are left to the user
+    tokens = list(
+        SocialToken.objects.filter(expires_at__isnull=False, expires_at__lte=now + window)
+        .exclude(account__health__needs_reauth=True)
+        .select_related("account", "app")
+        .order_by("expires_at")
+    )
+
+    refreshed = failed = 0
+    with ThreadPoolExecutor(max_workers=settings.TOKEN_REFRESH_CONCURRENCY) as executor:
+        for start in range(0, len(tokens), BATCH_SIZE):
+            batch = tokens[start:start + BATCH_SIZE]
+            results = list(executor.map(_refresh, batch))
+
+            updated_tokens = []
+            healthy = []
+            flagged = []
+            for social_token, result in zip(batch, results):
+                if result.get("success"):
+                    social_token.token = result["access_token"]
+                    if result.get("refresh_token"):
+                        social_token.token_secret = result["refresh_token"]
+                    if result.get("expires_in"):
+                        social_token.expires_at = now + timedelta(seconds=int(result["expires_in"]))
+                    updated_tokens.append(social_token)
+                    healthy.append(SocialAccountHealth(
+                        social_account=social_token.account,
+                        needs_reauth=False,
+                        last_refresh_error="",
+                        last_refreshed_at=now,
+                    ))
+                    refreshed += 1
+                else:
+                    logger.warning(
+                        f"Could not refresh token for SocialAccount ID {social_token.account_id}: {result.get('error')}"
+                    )
+                    flagged.append(SocialAccountHealth(
+                        social_account=social_token.account,
+                        needs_reauth=True,
+                        last_refresh_error=result.get("error") or "",
+                    ))
+                    failed += 1
+
+            SocialToken.objects.bulk_update(updated_tokens, ["token", "token_secret", "expires_at"])
+            SocialAccountHealth.objects.bulk_create(
+                healthy,
+                update_conflicts=True,
+                unique_fields=["social_account"],
+                update_fields=["needs_reauth", "last_refresh_error", "last_refreshed_at", "updated_at"],
+            )
+            SocialAccountHealth.objects.bulk_create(
+                flagged,
+                update_conflicts=True,
+                unique_fields=["social_account"],
+                update_fields=["needs_reauth", "last_refresh_error", "updated_at"],
+            )
+
+    return {"refreshed": refreshed, "failed": failed}
@@ -9,5 +9,7 @@ urlpatterns = [
     path('<int:pk>/publish/', views.PublishPostView.as_view(), name='publish-post'),
     path('<int:pk>/cancel/', views.CancelPostView.as_view(), name='cancel-post'),
     path('metrics/', views.PostMetricsListView.as_view(), name='post-metrics'),
+    path('metrics/publish-lag/', views.PublishLagMetricsView.as_view(), name='publish-lag-metrics'),
+    path('link-preview/', views.LinkPreviewView.as_view(), name='link-preview'),
     path('upload/cloudinary/', views.CloudinaryMediaUploadView.as_view(), name='cloudinary-upload'),
 ]
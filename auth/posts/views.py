@@ -2,6 +2,7 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
+from django.http import Http404, HttpResponse, HttpResponseRedirect
 from django.utils import timezone
 from django.db.models import Q
 from .models import Post, PostPlatform, PostMedia, PostMetrics
@@ -13,7 +14,8 @@ from .serializers import (
     SchedulePostSerializer,
     PostMetricsSerializer
 )
-from .tasks import publish_post_task
+from .tasks import build_post_renditions_task, publish_post_task
+from . import instrumentation, previews, shortlinks
 import logging
 
 logger = logging.getLogger(__name__)
@@ -132,6 +134,9 @@ class SchedulePostView(APIView):
             post.status = 'scheduled'
             post.scheduled_time = serializer.validated_data['scheduled_time']
             post.save()
+
+            # Prepare per-platform image renditions ahead of publishing
+            build_post_renditions_task.delay(post.id)
             
             # Return updated post
             return Response(
@@ -180,10 +185,20 @@ class PublishPostView(APIView):
         social_account_ids = [social.id for social in social_accounts]
         
         # Update PostPlatform entries
+        now = timezone.now()
         for pp in post_platforms:
-            pp.status = 'scheduled'
-            pp.published_at = timezone.now()
+            pp.status = 'pending'
+            pp.dispatched_at = now
+            pp.started_at = None
+            pp.provider_latency = None
+            pp.published_at = None
             pp.save()
+
+            if post.scheduled_time and pp.social_account:
+                instrumentation.dispatch_lag.observe(
+                    instrumentation.seconds_between(post.scheduled_time, now),
+                    pp.social_account.provider
+                )
         
         # Trigger the async task with post ID and social account IDs
         publish_post_task.delay(post.id, social_account_ids)
@@ -231,6 +246,17 @@ class PostMetricsListView(generics.ListAPIView):
         ).select_related('post', 'platform_post', 'platform_post__platform_account')
 
 
+class PublishLagMetricsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """Publish-lag histograms in Prometheus text exposition format."""
+        return HttpResponse(
+            instrumentation.render_metrics(),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
+
+
 class CloudinaryMediaUploadView(APIView):
     parser_classes = (MultiPartParser, FormParser)
     permission_classes = [permissions.IsAuthenticated]
@@ -337,3 +363,40 @@ class CloudinaryMediaUploadView(APIView):
                 {"error": f"Failed to upload media: {str(e)}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+class LinkPreviewView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        url = request.query_params.get('url')
+        if not url:
+            return Response(
+                {"error": "url parameter is required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            return Response(previews.get_preview(url))
+        except previews.PreviewError as e:
+            return Response(
+                {"error": f"Could not fetch link preview: {str(e)}"},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY
+            )
+
+
+def short_link_redirect(request, code):
+    """
+    Redirect a short link to its target and buffer the click.
+    Served from the in-process/Redis cache; the database is only read for cold links.
+    """
+    link = shortlinks.resolve(code) or shortlinks.resolve_from_db(code)
+    if link is None:
+        raise Http404("Link not found.")
+
+    try:
+        shortlinks.record_click(link)
+    except Exception as e:
+        logger.error(f"Failed to record click for short link {code}: {str(e)}")
+
+    return HttpResponseRedirect(link["url"])
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Plan, Subscription, Invoice
+from .models import AIUsage, Plan, Subscription, Invoice
 
 @admin.register(Plan)
 class PlanAdmin(admin.ModelAdmin):
@@ -13,7 +13,7 @@ class PlanAdmin(admin.ModelAdmin):
         }),
         ('Features', {
             'fields': ('post_limit', 'account_limit', 'team_members', 'analytics_access', 
-                      'ai_generation', 'post_scheduling', 'calendar_view')
+                      'ai_generation', 'monthly_ai_tokens', 'post_scheduling', 'calendar_view')
         }),
     )
 
@@ -31,4 +31,11 @@ class InvoiceAdmin(admin.ModelAdmin):
     list_filter = ('status',)
     search_fields = ('subscription__user__email', 'transaction_id')
     date_hierarchy = 'invoice_date'
-    raw_id_fields = ('subscription',) 
\ No newline at end of file
+    raw_id_fields = ('subscription',) 
+
+@admin.register(AIUsage)
+class AIUsageAdmin(admin.ModelAdmin):
+    list_display = ('user', 'endpoint', 'month', 'tokens', 'requests', 'updated_at')
+    list_filter = ('endpoint', 'month')
+    search_fields = ('user__email',)
+    raw_id_fields = ('user',)
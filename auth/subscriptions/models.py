@@ -22,6 +22,7 @@ class Plan(models.Model):
     ai_generation = models.BooleanField(default=False)
     post_scheduling = models.BooleanField(default=False)
     calendar_view = models.BooleanField(default=False)
+    monthly_ai_tokens = models.PositiveIntegerField(default=0, help_text="0 for unlimited")
     
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -78,3 +79,19 @@ class Invoice(models.Model):
     
     def __str__(self):
         return f"Invoice #{self.id} - {self.subscription.user.email} - {self.status}"
+
+
+class AIUsage(models.Model):
+    """Monthly AI token usage per user and endpoint, flushed in batches from Redis counters."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='ai_usage')
+    endpoint = models.CharField(max_length=50)
+    month = models.DateField()
+    tokens = models.PositiveBigIntegerField(default=0)
+    requests = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'endpoint', 'month')
+
+    def __str__(self):
+        return f"{self.user.email} - {self.endpoint} ({self.month:%Y-%m}): {self.tokens} tokens"